@@ -0,0 +1,94 @@
+"""
+Write-behind buffer for autosaved picks
+Keeps only the latest answer per (user, question) and writes the batch in a
+single transaction, so a burst of radio clicks costs one commit per interval
+"""
+import atexit
+import threading
+from datetime import datetime
+
+from background import ProcessThread
+from config import Config
+from database import UserAnswer, Settings
+
+
+class AnswerBuffer(ProcessThread):
+    """Per-process coalescing buffer flushed by a background thread"""
+    
+    def __init__(self, interval=None):
+        super().__init__('answer-flusher')
+        self.interval = Config.ANSWER_FLUSH_INTERVAL if interval is None else interval
+        self._pending = {}
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+    
+    def add(self, user_id, question_id, answer):
+        """Queue a pick; a later pick for the same question replaces it"""
+        self.ensure_started()
+        with self._lock:
+            self._pending[(user_id, question_id)] = (answer, datetime.utcnow().isoformat())
+    
+    def pending_for_user(self, user_id):
+        """Get this worker's unflushed picks for a user as {question_id: answer}"""
+        with self._lock:
+            return {qid: answer for (uid, qid), (answer, _) in self._pending.items()
+                    if uid == user_id}
+    
+    def discard(self, user_id, question_ids):
+        """Drop queued picks that a full form submission is about to overwrite"""
+        with self._lock:
+            for question_id in question_ids:
+                self._pending.pop((user_id, question_id), None)
+    
+    def flush(self):
+        """Write every queued pick in one transaction; returns the row count"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            
+            try:
+                UserAnswer.save_many([(user_id, question_id, answer, submitted_at)
+                                      for (user_id, question_id), (answer, submitted_at)
+                                      in batch.items()])
+            except Exception:
+                # Requeue anything that has not been superseded meanwhile
+                with self._lock:
+                    for key, value in batch.items():
+                        self._pending.setdefault(key, value)
+                raise
+            return len(batch)
+    
+    def _seconds_until_lock(self):
+        lock_time = Settings.get_lock_time()
+        if lock_time is None:
+            return None
+        return (lock_time - Settings.now()).total_seconds()
+    
+    def _run(self):
+        while True:
+            # Sleep one interval, but wake exactly at the deadline so picks
+            # made just before the lock are on disk when the lock hits
+            timeout = self.interval
+            try:
+                until_lock = self._seconds_until_lock()
+                if until_lock is not None and 0 <= until_lock < timeout:
+                    timeout = until_lock
+            except Exception:
+                pass
+            self._wake.wait(timeout)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠ Failed to flush autosaved picks: {e}")
+    
+    def _on_start(self):
+        # Picks queued by the parent are the parent's to flush
+        self._pending = {}
+        self._flush_lock = threading.Lock()
+        atexit.register(self.flush)
+
+
+answer_buffer = AnswerBuffer()
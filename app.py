@@ -1,36 +1,50 @@
 """
 Super Bowl Props Web App - Main Application
 """
+import csv
+import hashlib
+import io
+import json
 import os
 import secrets
+import sqlite3
+import time
 from datetime import datetime
 from functools import wraps
 
-from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, session
+import click
+from flask import (
+    Blueprint, Flask, render_template, redirect, url_for, flash, request, jsonify, session,
+    g, has_request_context, make_response, current_app
+)
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_mail import Mail, Message
 from flask_wtf.csrf import CSRFProtect
 
 from config import Config
 from database import (
-    init_db, User, PropQuestion, UserAnswer, Settings, get_db_connection,
+    init_db, User, PropQuestion, UserAnswer, Settings, Score, CacheGenerations,
+    GenerationCache, get_db_connection, db_connection, DatabaseSession, set_session_provider,
     FreeformField, UserFreeformAnswer, GameConfig, TIMEZONE_CHOICES, DEFAULT_TIMEZONE
 )
+from answer_buffer import answer_buffer
+from props_loader import load_config, import_config
+from props_watcher import props_watcher
+from live import format_event, live_hub
+from migrations import SCHEMA_VERSION, get_schema_version
+from win_probability import win_probabilities
 from nfl_teams import NFL_TEAMS, get_team, get_teams_by_conference, get_all_teams
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Initialize extensions
-csrf = CSRFProtect(app)
-login_manager = LoginManager(app)
-login_manager.login_view = 'home'
+# Extensions and routes are bound to an app in create_app(); importing this
+# module opens no connections and writes nothing, so it is safe to preload
+csrf = CSRFProtect()
+login_manager = LoginManager()
+login_manager.login_view = 'main.home'
 login_manager.login_message = '🏈 Please use your personal invite link to access the game.'
 login_manager.login_message_category = 'info'
+mail = Mail()
 
-# Initialize database tables on startup
-init_db()
+bp = Blueprint('main', __name__)
 
 # Create admin user if none exists, or fix if password is missing
 def ensure_admin_exists():
@@ -60,105 +74,193 @@ def ensure_admin_exists():
             admin.save()
             print(f"✓ Fixed admin password (from {'MASTER_KEY env' if os.environ.get('MASTER_KEY') else 'default'})")
 
-ensure_admin_exists()
-
 # Load props from config file
 def load_props_from_config(force_reload=False):
-    """Load prop questions from props_config.json"""
-    import json
-    
-    config_path = os.path.join(os.path.dirname(__file__), 'props_config.json')
-    if not os.path.exists(config_path):
+    """Load prop questions from props_config.json.
+    
+    Only fills an empty database unless force_reload is set; a reload
+    applies just the differences (see props_loader.import_config). Returns
+    the import summary, or None if nothing was loaded.
+    """
+    config = load_config()
+    if config is None:
         print("⚠ props_config.json not found")
-        return 0
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
+        return None
     
     if not force_reload:
-        cursor.execute('SELECT COUNT(*) as count FROM prop_questions')
-        if cursor.fetchone()['count'] > 0:
-            conn.close()
-            return 0  # Props already exist
-    
-    if force_reload:
-        cursor.execute('DELETE FROM prop_questions')
-        conn.commit()
+        with db_connection() as conn:
+            if conn.execute('SELECT 1 FROM prop_questions LIMIT 1').fetchone():
+                return None  # Props already exist
     
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-    
-    props = config.get('props', [])
+    summary = import_config(config)
+    print(f"✓ Loaded props from config: {summary['inserted']} added, "
+          f"{summary['updated']} updated, {summary['deactivated']} deactivated")
+    return summary
+
+def bootstrap():
+    """One-shot setup: migrate the schema, ensure the admin, load props if empty.
     
-    for i, prop in enumerate(props):
-        category = prop.get('category', 'Props')
-        label = prop.get('label', f"Question {i+1}")
-        options = prop.get('options', [])
-        
-        if len(options) >= 2:
-            if isinstance(options[0], dict):
-                opt = options[0]
-                if 'side' in opt and 'value' in opt:
-                    option_a = f"Over {opt['value']}"
-                    option_b = f"Under {options[1]['value']}"
-                else:
-                    option_a = opt.get('display', 'Option A')
-                    option_b = options[1].get('display', 'Option B')
-            else:
-                option_a = str(options[0])
-                option_b = str(options[1])
-        else:
-            option_a = "Yes"
-            option_b = "No"
-        
-        cursor.execute('''
-            INSERT INTO prop_questions (category, question, option_a, option_b, display_order, is_active)
-            VALUES (?, ?, ?, ?, ?, 1)
-        ''', (category, label, option_a, option_b, i))
-    
-    # Load freeform fields (tiebreakers) if present
-    freeform_fields = config.get('freeform_fields', [])
-    for i, field in enumerate(freeform_fields):
-        cursor.execute('''
-            INSERT OR REPLACE INTO freeform_fields (field_id, label, field_type, placeholder, display_order)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            field.get('id', f'field_{i}'),
-            field.get('label', f'Field {i+1}'),
-            field.get('type', 'number'),
-            field.get('placeholder', ''),
-            i
-        ))
-    
-    conn.commit()
-    conn.close()
-    print(f"✓ Loaded {len(props)} props from config")
-    return len(props)
+    Run once per deploy (gunicorn's master does it before forking workers,
+    or `flask --app app bootstrap`), not on every worker import.
+    """
+    init_db()
+    ensure_admin_exists()
+    load_props_from_config()
+
+# GET endpoints that still write (e.g. recording a visit) and so need the
+# write lock from the start of their unit of work
+WRITE_ENDPOINTS = {'main.access_game'}
+
+# POST endpoints that only read, so they don't hold the database-wide write
+# lock for the whole request (e.g. while a password hash is checked). One
+# that occasionally writes calls get_db_session().begin_write() first.
+READ_ONLY_ENDPOINTS = {'main.admin_login', 'main.api_save_answer'}
+
+
+def get_db_session():
+    """Get the request-scoped database session, opening it lazily"""
+    if 'db_session' not in g:
+        write = ((request.method not in ('GET', 'HEAD', 'OPTIONS')
+                  and request.endpoint not in READ_ONLY_ENDPOINTS)
+                 or request.endpoint in WRITE_ENDPOINTS)
+        g.db_session = DatabaseSession(write=write)
+    return g.db_session
+
+
+def _request_db_session():
+    if not has_request_context() or g.get('db_session_closed'):
+        return None
+    return get_db_session()
 
-# Load props on startup if database is empty
-load_props_from_config()
 
-mail = Mail(app)
+set_session_provider(_request_db_session)
 
 
-@app.before_request
+# Probe endpoints: no cookie session, no request DB session, no templates
+HEALTH_ENDPOINTS = {'main.healthz', 'main.readyz'}
+
+
+@bp.before_app_request
 def ensure_session():
     """Ensure session is initialized for CSRF to work"""
+    if request.endpoint in HEALTH_ENDPOINTS:
+        return
     session.permanent = True
 
 
+@bp.before_app_request
+def watch_props_config():
+    """Pick up edits to props_config.json (starts the watcher once per worker)"""
+    props_watcher.ensure_started()
+
+
+@bp.after_app_request
+def commit_db_session(response):
+    """Commit the request's unit of work before the response goes out"""
+    db_session = g.get('db_session')
+    if db_session is not None and response.status_code < 500:
+        db_session.commit()
+    return response
+
+
+@bp.teardown_app_request
+def close_db_session(error=None):
+    """Roll back anything left uncommitted and release the connection"""
+    db_session = g.pop('db_session', None)
+    g.db_session_closed = True
+    if db_session is not None:
+        db_session.close()
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.get_by_id(int(user_id))
 
 
+def generation_etag(names, *parts):
+    """Build an ETag from cache generations plus request-specific parts.
+    
+    Computed without touching the page data, so an unchanged page can be
+    answered with a 304 before anything is loaded or rendered.
+    """
+    generations = CacheGenerations.sync()
+    key = repr(([generations.get(name, 0) for name in names], parts))
+    return hashlib.sha1(key.encode()).hexdigest()[:24]
+
+
+def conditional_response(etag, build):
+    """Return 304 if the client already has this ETag, else build() the response"""
+    # Flashed messages are rendered once and then consumed, so pages
+    # carrying them are never served from the client's cache
+    if '_flashes' not in session and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def stream_query(query, params=()):
+    """Yield the rows of a query from a connection of its own.
+    
+    Rows come off the SQLite cursor a batch at a time, so a streamed
+    response holds one batch in memory however large the result is. The
+    connection is not the request's, which is closed before streaming starts.
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def csv_chunks(header, rows):
+    """Encode rows as CSV, yielding a chunk every few hundred rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % 500 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(records):
+    """Encode dicts as newline-delimited JSON, yielding a chunk every few hundred"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record))
+        if len(lines) == 500:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def download_response(chunks, filename, mimetype):
+    """Stream generated chunks to the browser as a file download"""
+    response = current_app.response_class(chunks, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
 def admin_required(f):
     """Decorator to require admin access"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if not current_user.is_authenticated or not current_user.is_admin:
             flash('Commissioner access required.', 'error')
-            return redirect(url_for('home'))
+            return redirect(url_for('main.home'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -167,88 +269,136 @@ def admin_required(f):
 # CONTEXT PROCESSORS
 # ============================================================================
 
-@app.context_processor
-def inject_game_config():
-    """Make game configuration available to all templates"""
+def _load_template_context(conn):
     config = GameConfig.get_all()
-    team_a = get_team(config.get('team_a_code', ''))
-    team_b = get_team(config.get('team_b_code', ''))
     
     # Add formatted display date
     config['display_date'] = GameConfig.get_display_date()
     config['venue_display'] = GameConfig.get_venue_display()
     
+    # The lock time is part of the settings; only the comparison with the
+    # clock has to happen per call
+    lock_time = Settings.get_lock_time()
+    
     return {
         'game_config': config,
-        'game_team_a': team_a,
-        'game_team_b': team_b
+        'game_team_a': get_team(config.get('team_a_code', '')),
+        'game_team_b': get_team(config.get('team_b_code', '')),
+        'now': datetime.utcnow,
+        'is_locked': lambda: lock_time is not None and Settings.now() >= lock_time
     }
 
 
+# Built once per settings generation and shared by every render
+_template_context = GenerationCache('settings', _load_template_context)
+
+
+@bp.app_context_processor
+def inject_game_config():
+    """Make game configuration and utility functions available to all templates"""
+    return _template_context.get()
+
+
+# ============================================================================
+# HEALTH CHECKS
+# ============================================================================
+
+@bp.route('/healthz')
+def healthz():
+    """Liveness: the worker is up and serving requests"""
+    response = jsonify({'status': 'ok'})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@bp.route('/readyz')
+def readyz():
+    """Readiness: one cheap DB round trip plus migration and cache state"""
+    ready = False
+    body = {'status': 'unavailable'}
+    conn = None
+    try:
+        conn = get_db_connection()
+        body['schema_version'] = get_schema_version(conn)
+        body['expected_schema_version'] = SCHEMA_VERSION
+        body['caches'] = {row['name']: row['generation'] for row in
+                          conn.execute('SELECT name, generation FROM cache_generations')}
+        ready = body['schema_version'] >= SCHEMA_VERSION
+        body['status'] = 'ready' if ready else 'migrating'
+    except sqlite3.Error as e:
+        body['error'] = str(e)
+    finally:
+        if conn is not None:
+            conn.close()
+    
+    response = jsonify(body)
+    response.status_code = 200 if ready else 503
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
 # ============================================================================
 # PUBLIC ROUTES
 # ============================================================================
 
-@app.route('/')
+@bp.route('/')
 def home():
     """Landing page"""
     if current_user.is_authenticated:
         if Settings.is_locked():
-            return redirect(url_for('dashboard'))
-        return redirect(url_for('prop_form'))
+            return redirect(url_for('main.dashboard'))
+        return redirect(url_for('main.prop_form'))
     return render_template('welcome.html')
 
 
-@app.route('/play/<token>')
+@bp.route('/play/<token>')
 def access_game(token):
     """Access the game via unique link"""
     user = User.get_by_access_token(token)
     
     if user is None:
         flash('Invalid or expired link. Please contact the host for a new invite.', 'error')
-        return redirect(url_for('home'))
+        return redirect(url_for('main.home'))
     
     # Log them in
-    user.last_visit = datetime.utcnow().isoformat()
-    user.save()
+    user.record_visit()
     login_user(user, remember=True)
     
     flash(f'Welcome to the game, {user.display_name}!', 'success')
     
     if Settings.is_locked():
-        return redirect(url_for('dashboard'))
-    return redirect(url_for('prop_form'))
+        return redirect(url_for('main.dashboard'))
+    return redirect(url_for('main.prop_form'))
 
 
-@app.route('/logout')
+@bp.route('/logout')
 def logout():
     """User logout"""
     logout_user()
-    return redirect(url_for('home'))
+    return redirect(url_for('main.home'))
 
 
-@app.route('/admin/login', methods=['GET', 'POST'])
+@bp.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     """Admin login page"""
     if current_user.is_authenticated and current_user.is_admin:
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     if request.method == 'POST':
         password = request.form.get('password', '')
         
         # Find admin user
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE is_admin = 1 LIMIT 1')
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE is_admin = 1 LIMIT 1')
+            row = cursor.fetchone()
         
         if row:
             admin = User.from_row(row)
             if admin.check_admin_password(password):
                 login_user(admin, remember=True)
                 flash('Welcome, Commissioner!', 'success')
-                return redirect(url_for('admin_panel'))
+                return redirect(url_for('main.admin_panel'))
         
         flash('Invalid password.', 'error')
     
@@ -259,7 +409,7 @@ def admin_login():
 # PROP BET FORM
 # ============================================================================
 
-@app.route('/props', methods=['GET', 'POST'])
+@bp.route('/props', methods=['GET', 'POST'])
 @login_required
 def prop_form():
     """Main prop bet form"""
@@ -269,7 +419,7 @@ def prop_form():
     if request.method == 'POST':
         if is_locked:
             flash('Time\'s up! Submissions are locked.', 'error')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         
         # Get all answers from the form
         answers = {}
@@ -282,42 +432,55 @@ def prop_form():
                 field_id = key[3:]
                 freeform_answers[field_id] = value
         
-        # Save answers
+        # Save answers (queued autosaves for these questions are now stale)
+        answer_buffer.discard(current_user.id, [int(qid) for qid in answers])
         UserAnswer.save_all_answers(current_user.id, answers)
         UserFreeformAnswer.save_all_answers(current_user.id, freeform_answers)
         flash('Your picks have been saved!', 'success')
-        return redirect(url_for('prop_form'))
-    
-    # Get questions by category
-    questions_by_category = PropQuestion.get_by_category()
-    
-    # Get user's current answers
-    user_answers = UserAnswer.get_user_answers(current_user.id)
-    
-    # Get freeform fields and answers
-    freeform_fields = FreeformField.get_all()
-    user_freeform_answers = UserFreeformAnswer.get_user_answers(current_user.id)
-    
-    # Count total questions for progress display
-    total_count = sum(len(qs) for qs in questions_by_category.values())
-    answered_count = len(user_answers)
+        return redirect(url_for('main.prop_form'))
+    
+    pending_answers = answer_buffer.pending_for_user(current_user.id)
+    # The page embeds a CSRF token, so let cached copies age out well
+    # before the token does
+    csrf_window = int(time.time() // (Config.WTF_CSRF_TIME_LIMIT // 2))
+    etag = generation_etag(('answers', 'questions', 'settings'),
+                           current_user.id, current_user.is_admin, is_locked,
+                           sorted(pending_answers.items()), csrf_window)
+    
+    def build():
+        # Get questions by category
+        questions_by_category = PropQuestion.get_by_category()
+        
+        # Get user's current answers
+        user_answers = UserAnswer.get_user_answers(current_user.id)
+        user_answers.update(pending_answers)
+        
+        # Get freeform fields and answers
+        freeform_fields = FreeformField.get_all()
+        user_freeform_answers = UserFreeformAnswer.get_user_answers(current_user.id)
+        
+        # Count total questions for progress display
+        total_count = sum(len(qs) for qs in questions_by_category.values())
+        answered_count = len(user_answers)
+        
+        return render_template('prop_form.html',
+                              questions_by_category=questions_by_category,
+                              user_answers=user_answers,
+                              freeform_fields=freeform_fields,
+                              user_freeform_answers=user_freeform_answers,
+                              answered_count=answered_count,
+                              total_count=total_count,
+                              is_locked=is_locked,
+                              lock_time=lock_time)
     
-    return render_template('prop_form.html',
-                          questions_by_category=questions_by_category,
-                          user_answers=user_answers,
-                          freeform_fields=freeform_fields,
-                          user_freeform_answers=user_freeform_answers,
-                          answered_count=answered_count,
-                          total_count=total_count,
-                          is_locked=is_locked,
-                          lock_time=lock_time)
+    return conditional_response(etag, build)
 
 
 # ============================================================================
 # DASHBOARD & LEADERBOARD
 # ============================================================================
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 @login_required
 def dashboard():
     """Dashboard showing all answers and leaderboard"""
@@ -327,85 +490,77 @@ def dashboard():
     # Always allow viewing if admin, otherwise only after lock
     if not is_locked and not current_user.is_admin:
         flash('The scoreboard will be available after the deadline!', 'info')
-        return redirect(url_for('prop_form'))
-    
-    # Get all data
-    questions = PropQuestion.get_active()
-    users = User.get_participants()
-    all_answers = UserAnswer.get_all_answers()
-    
-    # Get freeform fields and all answers
-    freeform_fields = FreeformField.get_all()
-    all_freeform_answers = UserFreeformAnswer.get_all_answers()
-    
-    # Calculate scores
-    scores = {}
-    for user in users:
-        correct = 0
-        answered = 0
-        user_ans = all_answers.get(user.id, {})
-        for q in questions:
-            if q.id in user_ans:
-                answered += 1
-                if q.correct_answer and user_ans[q.id] == q.correct_answer:
-                    correct += 1
+        return redirect(url_for('main.prop_form'))
+    
+    # The picks tabs show one page of players at a time, so the page (and
+    # the picks loaded for it) stays the same size as the pool grows
+    page = max(request.args.get('page', 1, type=int), 1)
+    etag = generation_etag(('answers', 'questions', 'settings', 'scores', 'users'),
+                           current_user.id, current_user.is_admin, is_locked, page)
+    
+    def build():
+        # Get all data
+        questions = PropQuestion.get_active()
+        participants = User.get_participants()
+        page_size = Config.DASHBOARD_PICKS_PAGE_SIZE
+        page_count = max((len(participants) + page_size - 1) // page_size, 1)
+        current_page = min(page, page_count)
+        users = participants[(current_page - 1) * page_size:current_page * page_size]
+        all_answers = UserAnswer.get_answers_for_users([user.id for user in users])
+        pick_counts = UserAnswer.get_pick_counts()
         
-        # Calculate tiebreaker difference (for total score predictions)
-        tiebreaker_diff = None
-        user_ff = all_freeform_answers.get(user.id, {})
-        for ff in freeform_fields:
-            if ff.correct_value and ff.field_id in user_ff:
-                try:
-                    predicted = float(user_ff[ff.field_id])
-                    actual = float(ff.correct_value)
-                    tiebreaker_diff = abs(predicted - actual)
-                except (ValueError, TypeError):
-                    pass
+        # Get freeform fields and every player's tiebreaker guesses (one
+        # value per player and field, shown next to the leaderboard)
+        freeform_fields = FreeformField.get_all()
+        all_freeform_answers = UserFreeformAnswer.get_all_answers()
         
-        scores[user.id] = {
-            'correct': correct,
-            'answered': answered,
-            'total': len(questions),
-            'tiebreaker_diff': tiebreaker_diff
-        }
-    
-    # Sort users by score for leaderboard (then by tiebreaker if tied)
-    def sort_key(u):
-        s = scores[u.id]
-        # Higher correct is better, lower tiebreaker_diff is better
-        # Use large number if no tiebreaker to sort them last among ties
-        tb = s['tiebreaker_diff'] if s['tiebreaker_diff'] is not None else 9999
-        return (-s['correct'], tb)
-    
-    leaderboard = sorted(users, key=sort_key)
-    
-    # Group questions by category for display
-    questions_by_category = PropQuestion.get_by_category()
-    
-    return render_template('dashboard.html',
-                          questions=questions,
-                          questions_by_category=questions_by_category,
-                          users=users,
-                          all_answers=all_answers,
-                          freeform_fields=freeform_fields,
-                          all_freeform_answers=all_freeform_answers,
-                          scores=scores,
-                          leaderboard=leaderboard,
-                          is_locked=is_locked,
-                          lock_time=lock_time)
+        # Scores are maintained incrementally; read them pre-sorted
+        # (most correct first, then closest tiebreaker)
+        leaderboard = []
+        scores = {}
+        for user, score in Score.get_leaderboard():
+            score['total'] = len(questions)
+            scores[user.id] = score
+            leaderboard.append(user)
+        
+        # Chances of finishing first while props are still open
+        win_chances = win_probabilities()
+        
+        # Group questions by category for display
+        questions_by_category = PropQuestion.get_by_category()
+        
+        return render_template('dashboard.html',
+                              questions=questions,
+                              questions_by_category=questions_by_category,
+                              users=users,
+                              all_answers=all_answers,
+                              pick_counts=pick_counts,
+                              page=current_page,
+                              page_count=page_count,
+                              player_count=len(participants),
+                              page_size=page_size,
+                              freeform_fields=freeform_fields,
+                              all_freeform_answers=all_freeform_answers,
+                              scores=scores,
+                              leaderboard=leaderboard,
+                              win_chances=win_chances,
+                              scores_version=CacheGenerations.get('scores'),
+                              is_locked=is_locked,
+                              lock_time=lock_time)
+    
+    return conditional_response(etag, build)
 
 
 # ============================================================================
 # ADMIN ROUTES
 # ============================================================================
 
-@app.route('/admin')
+@bp.route('/admin')
 @login_required
 @admin_required
 def admin_panel():
     """Admin control panel"""
-    users = User.get_all()
-    participants = [u for u in users if not u.is_admin]
+    participants = User.get_participants()
     questions = PropQuestion.get_all()
     lock_time = Settings.get_lock_time()
     is_locked = Settings.is_locked()
@@ -418,7 +573,6 @@ def admin_panel():
     current_time = Settings.now()
     
     return render_template('admin/panel.html',
-                          users=users,
                           participants=participants,
                           questions=questions,
                           answered_questions=answered_questions,
@@ -430,7 +584,7 @@ def admin_panel():
                           current_time=current_time)
 
 
-@app.route('/admin/add-player', methods=['POST'])
+@bp.route('/admin/add-player', methods=['POST'])
 @login_required
 @admin_required
 def admin_add_player():
@@ -439,7 +593,7 @@ def admin_add_player():
     
     if not display_name:
         flash('Please enter a name for the player.', 'error')
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     # Generate unique access token
     access_token = secrets.token_urlsafe(16)
@@ -452,10 +606,194 @@ def admin_add_player():
     user.save()
     
     flash(f'Added {display_name}! Their personal link is ready to share.', 'success')
-    return redirect(url_for('admin_panel'))
+    return redirect(url_for('main.admin_panel'))
 
 
-@app.route('/admin/player/<int:user_id>/delete', methods=['POST'])
+@bp.route('/admin/players/import', methods=['POST'])
+@login_required
+@admin_required
+def admin_import_players():
+    """Add many players at once from an uploaded CSV or a pasted list"""
+    upload = request.files.get('players_file')
+    if upload and upload.filename:
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', errors='replace')
+    else:
+        lines = io.StringIO(request.form.get('players_text', ''))
+    
+    # Names are the first column; skip a header row if there is one
+    names = [row[0] for row in csv.reader(lines) if row]
+    if names and names[0].strip().lower() in ('name', 'display_name', 'display name', 'player'):
+        names = names[1:]
+    
+    if not any(name.strip() for name in names):
+        flash('No player names found.', 'error')
+        return redirect(url_for('main.admin_panel'))
+    
+    added, skipped = User.create_many(names)
+    message = f'Added {added} players!'
+    if skipped:
+        message += f' Skipped {skipped} already in the pool or listed twice.'
+    flash(message, 'success')
+    return redirect(url_for('main.admin_panel'))
+
+
+@bp.route('/admin/players/export.csv')
+@login_required
+@admin_required
+def admin_export_invites():
+    """Download every player's invite link as CSV"""
+    base_url = Config.APP_URL.rstrip('/')
+    rows = ((row['display_name'], f"{base_url}/play/{row['access_token']}")
+            # Plain (binary) name order comes straight off idx_users_admin_name
+            for row in stream_query('''
+                SELECT display_name, access_token FROM users
+                WHERE is_admin = 0 ORDER BY display_name
+            '''))
+    return download_response(csv_chunks(['display_name', 'invite_link'], rows),
+                             'invite_links.csv', 'text/csv')
+
+
+# Players in rowid order: a plain walk of the table, with nothing for
+# SQLite to sort or hold (NOT is_admin keeps it off the is_admin index)
+EXPORT_PLAYERS_QUERY = '''
+    SELECT u.id, u.display_name, COALESCE(s.correct, 0) AS correct,
+           COALESCE(s.answered, 0) AS answered
+    FROM users u
+    LEFT JOIN scores s ON s.user_id = u.id
+    WHERE NOT u.is_admin
+    ORDER BY u.id
+'''
+
+# One player's answers, looked up through the UNIQUE (user_id, ...) indexes
+EXPORT_PICKS_QUERY = '''
+    SELECT q.id, q.prop_key, q.category, q.question, q.display_order,
+           q.correct_answer, ua.answer,
+           CASE ua.answer WHEN 'A' THEN q.option_a WHEN 'B' THEN q.option_b END AS choice
+    FROM user_answers ua
+    JOIN prop_questions q ON q.id = ua.question_id
+    WHERE ua.user_id = ? AND q.is_active = 1
+'''
+
+EXPORT_TIEBREAKERS_QUERY = '''
+    SELECT f.field_id, f.label, f.display_order, f.correct_value, fa.value
+    FROM user_freeform_answers fa
+    JOIN freeform_fields f ON f.field_id = fa.field_id
+    WHERE fa.user_id = ?
+'''
+
+EXPORT_LONG_COLUMNS = ['player', 'kind', 'prop', 'category', 'question',
+                       'pick', 'choice', 'correct', 'is_correct']
+
+
+def _export_players():
+    """Yield (player, picks, tiebreakers) for every player, one at a time.
+    
+    Players come off a cursor in batches and each one's answers are fetched
+    by index, so neither SQLite nor Python ever holds more than one
+    player's picks. Runs in one read transaction for a consistent snapshot
+    on a connection of its own (the request's is closed before streaming).
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN')
+        players = conn.execute(EXPORT_PLAYERS_QUERY)
+        while True:
+            batch = players.fetchmany(500)
+            if not batch:
+                break
+            for player in batch:
+                picks = sorted(conn.execute(EXPORT_PICKS_QUERY, (player['id'],)),
+                               key=lambda row: (row['display_order'], row['id']))
+                tiebreakers = sorted(conn.execute(EXPORT_TIEBREAKERS_QUERY, (player['id'],)),
+                                     key=lambda row: row['display_order'])
+                yield player, picks, tiebreakers
+    finally:
+        conn.close()
+
+
+def _export_long():
+    """Yield one dict per answer, in EXPORT_LONG_COLUMNS order"""
+    for player, picks, tiebreakers in _export_players():
+        for row in picks:
+            yield {
+                'player': player['display_name'],
+                'kind': 'prop',
+                'prop': row['prop_key'] or row['id'],
+                'category': row['category'],
+                'question': row['question'],
+                'pick': row['answer'],
+                'choice': row['choice'],
+                'correct': row['correct_answer'],
+                'is_correct': (None if row['correct_answer'] is None
+                               else row['answer'] == row['correct_answer']),
+            }
+        for row in tiebreakers:
+            yield {
+                'player': player['display_name'],
+                'kind': 'tiebreaker',
+                'prop': row['field_id'],
+                'category': 'Tiebreaker',
+                'question': row['label'],
+                'pick': row['value'],
+                'choice': row['value'],
+                'correct': row['correct_value'],
+                'is_correct': None,
+            }
+
+
+def _export_matrix(questions, fields):
+    """Yield one dict per player with their picks keyed by prop and tiebreaker"""
+    prop_keys = {question.id: question.prop_key or str(question.id) for question in questions}
+    field_ids = {field.field_id for field in fields}
+    for player, picks, tiebreakers in _export_players():
+        yield {
+            'player': player['display_name'],
+            'correct': player['correct'],
+            'answered': player['answered'],
+            'picks': {prop_keys[row['id']]: row['choice'] for row in picks if row['id'] in prop_keys},
+            'tiebreakers': {row['field_id']: row['value'] for row in tiebreakers
+                            if row['field_id'] in field_ids},
+        }
+
+
+@bp.route('/admin/export/picks')
+@login_required
+@admin_required
+def admin_export_picks():
+    """Download every player's picks as CSV or NDJSON.
+    
+    ?layout=wide (default) gives one row per player with a column per prop
+    and tiebreaker; ?layout=long gives one row per answer. ?format=ndjson
+    gives one JSON object per line instead of CSV.
+    """
+    layout = request.args.get('layout', 'wide')
+    output = request.args.get('format', 'csv')
+    if layout not in ('wide', 'long') or output not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'error': 'layout must be wide or long, format csv or ndjson'}), 400
+    
+    if layout == 'long':
+        records = _export_long()
+        header = EXPORT_LONG_COLUMNS
+        to_row = lambda record: [record[column] for column in header]
+    else:
+        questions = PropQuestion.get_active()
+        fields = FreeformField.get_all()
+        records = _export_matrix(questions, fields)
+        prop_keys = [question.prop_key or str(question.id) for question in questions]
+        header = (['player', 'correct', 'answered']
+                  + [question.question for question in questions]
+                  + [field.label for field in fields])
+        to_row = lambda record: ([record['player'], record['correct'], record['answered']]
+                                 + [record['picks'].get(key) for key in prop_keys]
+                                 + [record['tiebreakers'].get(field.field_id) for field in fields])
+    
+    filename = f'picks_{layout}.{output}'
+    if output == 'ndjson':
+        return download_response(ndjson_chunks(records), filename, 'application/x-ndjson')
+    return download_response(csv_chunks(header, map(to_row, records)), filename, 'text/csv')
+
+
+@bp.route('/admin/player/<int:user_id>/delete', methods=['POST'])
 @login_required
 @admin_required
 def admin_delete_player(user_id):
@@ -468,10 +806,10 @@ def admin_delete_player(user_id):
             name = user.display_name
             user.delete()
             flash(f'{name} has been removed.', 'success')
-    return redirect(url_for('admin_panel'))
+    return redirect(url_for('main.admin_panel'))
 
 
-@app.route('/admin/player/<int:user_id>/regenerate', methods=['POST'])
+@bp.route('/admin/player/<int:user_id>/regenerate', methods=['POST'])
 @login_required
 @admin_required
 def admin_regenerate_link(user_id):
@@ -481,23 +819,26 @@ def admin_regenerate_link(user_id):
         user.access_token = secrets.token_urlsafe(16)
         user.save()
         flash(f'New link generated for {user.display_name}!', 'success')
-    return redirect(url_for('admin_panel'))
+    return redirect(url_for('main.admin_panel'))
 
 
-@app.route('/admin/reload-props', methods=['POST'])
+@bp.route('/admin/reload-props', methods=['POST'])
 @login_required
 @admin_required
 def admin_reload_props():
     """Reload prop questions from props_config.json"""
-    count = load_props_from_config(force_reload=True)
-    if count > 0:
-        flash(f'✓ Reloaded {count} props from config file!', 'success')
+    summary = load_props_from_config(force_reload=True)
+    if summary is None:
+        flash('props_config.json not found.', 'warning')
+    elif summary['inserted'] or summary['updated'] or summary['deactivated'] or summary['fields']:
+        flash(f"✓ Reloaded props: {summary['inserted']} added, {summary['updated']} updated, "
+              f"{summary['deactivated']} removed. Existing picks were kept.", 'success')
     else:
-        flash('No props found in config file.', 'warning')
-    return redirect(url_for('admin_questions'))
+        flash('Props already match the config file.', 'info')
+    return redirect(url_for('main.admin_questions'))
 
 
-@app.route('/admin/lock-time', methods=['POST'])
+@bp.route('/admin/lock-time', methods=['POST'])
 @login_required
 @admin_required
 def admin_set_lock_time():
@@ -506,7 +847,7 @@ def admin_set_lock_time():
     
     if not lock_time_str:
         flash('Please select a deadline time.', 'error')
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     try:
         lock_time = datetime.fromisoformat(lock_time_str)
@@ -516,10 +857,10 @@ def admin_set_lock_time():
     except ValueError:
         flash('Invalid date/time format.', 'error')
     
-    return redirect(url_for('admin_panel'))
+    return redirect(url_for('main.admin_panel'))
 
 
-@app.route('/admin/timezone', methods=['POST'])
+@bp.route('/admin/timezone', methods=['POST'])
 @login_required
 @admin_required
 def admin_set_timezone():
@@ -530,14 +871,14 @@ def admin_set_timezone():
     valid_tzs = [t[0] for t in TIMEZONE_CHOICES]
     if tz not in valid_tzs:
         flash('Invalid timezone selected.', 'error')
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     Settings.set_timezone(tz)
     flash(f'Timezone set to {tz}', 'success')
-    return redirect(url_for('admin_panel'))
+    return redirect(url_for('main.admin_panel'))
 
 
-@app.route('/admin/game-settings', methods=['GET', 'POST'])
+@bp.route('/admin/game-settings', methods=['GET', 'POST'])
 @login_required
 @admin_required
 def admin_game_settings():
@@ -554,7 +895,7 @@ def admin_game_settings():
                 GameConfig.set(key, value)
         
         flash('Game settings saved!', 'success')
-        return redirect(url_for('admin_game_settings'))
+        return redirect(url_for('main.admin_game_settings'))
     
     # Get current config
     config = GameConfig.get_all()
@@ -575,68 +916,56 @@ def admin_game_settings():
                           team_b=team_b)
 
 
-@app.route('/admin/answers', methods=['GET', 'POST'])
+@bp.route('/admin/answers', methods=['GET', 'POST'])
 @login_required
 @admin_required
 def admin_answers():
     """Set correct answers (master key)"""
-    questions = PropQuestion.get_active()
-    questions_by_category = PropQuestion.get_by_category()
-    freeform_fields = FreeformField.get_all()
-    
     if request.method == 'POST':
-        print("DEBUG: POST received")
-        print("DEBUG: Form data:", dict(request.form))
+        is_xhr = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
         
         # Handle clear all
         if request.form.get('clear_all'):
-            print("DEBUG: Clearing all answers")
-            for q in questions:
-                q.correct_answer = None
-                q.save()
-            for field in freeform_fields:
-                field.correct_value = None
-                field.save()
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return jsonify({'success': True, 'message': 'All cleared'})
+            _, version = PropQuestion.grade({}, {}, replace=True)
+            if is_xhr:
+                return jsonify({'success': True, 'message': 'All cleared', 'version': version})
             flash('All answers cleared!', 'success')
-            return redirect(url_for('admin_answers'))
+            return redirect(url_for('main.admin_answers'))
         
         # Handle clear single answer
         clear_id = request.form.get('clear_answer')
         if clear_id:
-            print(f"DEBUG: Clearing answer for question {clear_id}")
-            question = PropQuestion.get_by_id(int(clear_id))
-            if question:
-                question.correct_answer = None
-                question.save()
-                print(f"DEBUG: Cleared Q{clear_id}")
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return jsonify({'success': True})
-            return redirect(url_for('admin_answers'))
+            _, version = PropQuestion.grade({int(clear_id): None})
+            if is_xhr:
+                return jsonify({'success': True, 'version': version})
+            return redirect(url_for('main.admin_answers'))
         
-        # Handle regular answer updates
+        # Handle regular answer updates (only what changed gets rescored)
+        answers = {}
+        freeform = {}
         for key, value in request.form.items():
             if key.startswith('answer_'):
-                question_id = int(key[7:])
-                question = PropQuestion.get_by_id(question_id)
-                if question:
-                    new_value = value if value else None
-                    print(f"DEBUG: Setting Q{question_id} to {repr(new_value)}")
-                    question.correct_answer = new_value
-                    question.save()
+                answers[int(key[7:])] = value
             elif key.startswith('ff_'):
-                field_id = key[3:]
-                field = FreeformField.get_by_field_id(field_id)
-                if field:
-                    field.correct_value = value if value else None
-                    field.save()
+                freeform[key[3:]] = value
         
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return jsonify({'success': True})
+        try:
+            _, version = PropQuestion.grade(answers, freeform)
+        except ValueError as e:
+            if is_xhr:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            flash(str(e), 'error')
+            return redirect(url_for('main.admin_answers'))
+        
+        if is_xhr:
+            return jsonify({'success': True, 'version': version})
         
         flash('Correct answers saved!', 'success')
-        return redirect(url_for('admin_answers'))
+        return redirect(url_for('main.admin_answers'))
+    
+    questions = PropQuestion.get_active()
+    questions_by_category = PropQuestion.get_by_category()
+    freeform_fields = FreeformField.get_all()
     
     return render_template('admin/answers.html',
                           questions=questions,
@@ -644,7 +973,7 @@ def admin_answers():
                           freeform_fields=freeform_fields)
 
 
-@app.route('/admin/questions', methods=['GET'])
+@bp.route('/admin/questions', methods=['GET'])
 @login_required
 @admin_required
 def admin_questions():
@@ -653,7 +982,7 @@ def admin_questions():
     return render_template('admin/questions.html', questions=questions)
 
 
-@app.route('/admin/questions/add', methods=['POST'])
+@bp.route('/admin/questions/add', methods=['POST'])
 @login_required
 @admin_required
 def admin_add_question():
@@ -665,7 +994,7 @@ def admin_add_question():
     
     if not all([category, question, option_a, option_b]):
         flash('All fields are required.', 'error')
-        return redirect(url_for('admin_questions'))
+        return redirect(url_for('main.admin_questions'))
     
     q = PropQuestion(
         category=category,
@@ -676,26 +1005,21 @@ def admin_add_question():
     q.save()
     
     flash('Question added!', 'success')
-    return redirect(url_for('admin_questions'))
+    return redirect(url_for('main.admin_questions'))
 
 
-@app.route('/admin/questions/<int:question_id>/delete', methods=['POST'])
+@bp.route('/admin/questions/<int:question_id>/delete', methods=['POST'])
 @login_required
 @admin_required
 def admin_delete_question(question_id):
     """Delete a prop question"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM user_answers WHERE question_id = ?', (question_id,))
-    cursor.execute('DELETE FROM prop_questions WHERE id = ?', (question_id,))
-    conn.commit()
-    conn.close()
+    PropQuestion.delete(question_id)
     
     flash('Question deleted.', 'success')
-    return redirect(url_for('admin_questions'))
+    return redirect(url_for('main.admin_questions'))
 
 
-@app.route('/admin/questions/reorder', methods=['POST'])
+@bp.route('/admin/questions/reorder', methods=['POST'])
 @login_required
 @admin_required
 def admin_reorder_questions():
@@ -704,22 +1028,12 @@ def admin_reorder_questions():
     if not data or 'order' not in data:
         return jsonify({'success': False, 'error': 'Invalid data'}), 400
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    for index, question_id in enumerate(data['order']):
-        cursor.execute(
-            'UPDATE prop_questions SET display_order = ? WHERE id = ?',
-            (index, question_id)
-        )
-    
-    conn.commit()
-    conn.close()
+    PropQuestion.reorder(data['order'])
     
     return jsonify({'success': True})
 
 
-@app.route('/admin/change-password', methods=['POST'])
+@bp.route('/admin/change-password', methods=['POST'])
 @login_required
 @admin_required
 def admin_change_password():
@@ -730,28 +1044,28 @@ def admin_change_password():
     
     if not current_user.check_admin_password(current_password):
         flash('Current password is incorrect.', 'error')
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     if len(new_password) < 6:
         flash('Password must be at least 6 characters.', 'error')
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     if new_password != confirm_password:
         flash('Passwords do not match.', 'error')
-        return redirect(url_for('admin_panel'))
+        return redirect(url_for('main.admin_panel'))
     
     current_user.set_admin_password(new_password)
     current_user.save()
     
     flash('Password changed!', 'success')
-    return redirect(url_for('admin_panel'))
+    return redirect(url_for('main.admin_panel'))
 
 
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
-@app.route('/api/save-answer', methods=['POST'])
+@bp.route('/api/save-answer', methods=['POST'])
 @login_required
 def api_save_answer():
     """Auto-save individual answers"""
@@ -763,13 +1077,18 @@ def api_save_answer():
     answer = data.get('answer')
     
     if question_id and answer:
-        UserAnswer.save_answer(current_user.id, int(question_id), answer)
+        if Config.ANSWER_WRITE_BEHIND:
+            # Only the flusher thread writes, so clicks never queue on the write lock
+            answer_buffer.add(current_user.id, int(question_id), answer)
+        else:
+            get_db_session().begin_write()
+            UserAnswer.save_answer(current_user.id, int(question_id), answer)
         return jsonify({'success': True})
     
     return jsonify({'success': False, 'error': 'Invalid data'})
 
 
-@app.route('/api/save-freeform', methods=['POST'])
+@bp.route('/api/save-freeform', methods=['POST'])
 @login_required
 def api_save_freeform():
     """Auto-save freeform field answers"""
@@ -787,42 +1106,138 @@ def api_save_freeform():
     return jsonify({'success': False, 'error': 'Invalid data'})
 
 
-@app.route('/api/lock-status')
+@bp.route('/api/lock-status')
 @login_required
 def api_lock_status():
     """Get current lock status"""
     lock_time = Settings.get_lock_time()
-    return jsonify({
-        'is_locked': Settings.is_locked(),
+    is_locked = Settings.is_locked()
+    etag = generation_etag(('settings',), is_locked)
+    return conditional_response(etag, lambda: jsonify({
+        'is_locked': is_locked,
         'lock_time': lock_time.isoformat() if lock_time else None
-    })
+    }))
+
+
+@bp.route('/api/standings')
+@login_required
+def api_standings():
+    """Get the ranked standings with max-possible scores and clinch status"""
+    is_locked = Settings.is_locked()
+    if not is_locked and not current_user.is_admin:
+        return jsonify({'error': 'Standings are available after the deadline'}), 403
+    
+    etag = generation_etag(('scores', 'users'), is_locked)
+    return conditional_response(etag, lambda: jsonify({
+        'version': CacheGenerations.get('scores'),
+        'standings': [dict(score, user_id=user.id, display_name=user.display_name)
+                      for user, score in Score.get_leaderboard()]
+    }))
+
+
+@bp.route('/api/admin/grade', methods=['POST'])
+@login_required
+@admin_required
+def api_admin_grade():
+    """Apply a full answer key or a diff in one transaction.
+    
+    Body: {"answers": {question_id: "A" | "B" | null},
+           "freeform": {field_id: value | null}, "replace": false}
+    """
+    data = request.get_json(silent=True)
+    if (not isinstance(data, dict) or not isinstance(data.get('answers', {}), dict)
+            or not isinstance(data.get('freeform') or {}, dict)):
+        return jsonify({'success': False, 'error': 'Invalid data'}), 400
+    
+    try:
+        changed, version = PropQuestion.grade(data.get('answers', {}),
+                                              data.get('freeform') or {},
+                                              replace=bool(data.get('replace')))
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({'success': True, 'changed': changed, 'version': version})
+
+
+@bp.route('/api/stream')
+@login_required
+def api_stream():
+    """Server-Sent Events: live leaderboard deltas and lock changes.
+    
+    ?events=lock asks for lock changes only. Players get nothing else
+    before the deadline either (same rule as the dashboard), so the pick
+    form hears the lock the moment it happens.
+    """
+    is_locked = Settings.is_locked()
+    lock_time = Settings.get_lock_time()
+    scores = (is_locked or current_user.is_admin) and request.args.get('events') != 'lock'
+    hello = {
+        'is_locked': is_locked,
+        'lock_time': lock_time.isoformat() if lock_time else None,
+        'version': CacheGenerations.get('scores') if scores else None,
+    }
+    
+    if live_hub.client_count >= Config.LIVE_MAX_STREAMS:
+        # Worker is full: send the current state, end at once and have the
+        # browser retry later (a 503 would make EventSource give up for
+        # good). Retry no later than the deadline so the lock is not missed.
+        retry = 15000
+        if lock_time is not None and not is_locked:
+            until_lock = (lock_time - Settings.now()).total_seconds() * 1000
+            retry = max(1000, min(retry, int(until_lock) + 1000))
+        return current_app.response_class(f'retry: {retry}\n\n' + format_event('hello', hello),
+                                          mimetype='text/event-stream')
+    
+    # Teardown only runs once the stream ends; don't keep the request's
+    # pooled connection for the stream's whole lifetime
+    close_db_session()
+    client = live_hub.subscribe(scores)
+    
+    response = current_app.response_class(live_hub.stream(client, hello),
+                                          mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
 
 
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found_error(error):
     return render_template('errors/404.html'), 404
 
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     return render_template('errors/500.html'), 500
 
 
 # ============================================================================
-# TEMPLATE CONTEXT
+# APP FACTORY
 # ============================================================================
 
-@app.context_processor
-def utility_processor():
-    """Add utility functions to template context"""
-    return {
-        'now': datetime.utcnow,
-        'is_locked': Settings.is_locked
-    }
+@click.command('bootstrap')
+def bootstrap_command():
+    """Migrate the database, ensure the admin user and load props."""
+    bootstrap()
+
+
+def create_app(config_object=Config):
+    """Create and configure the Flask app (no database access)"""
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    
+    csrf.init_app(app)
+    login_manager.init_app(app)
+    mail.init_app(app)
+    app.register_blueprint(bp)
+    app.cli.add_command(bootstrap_command)
+    return app
+
+
+app = create_app()
 
 
 # ============================================================================
@@ -830,5 +1245,5 @@ def utility_processor():
 # ============================================================================
 
 if __name__ == '__main__':
-    init_db()
+    bootstrap()
     app.run(debug=True, host='0.0.0.0', port=5000)
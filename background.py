@@ -0,0 +1,35 @@
+"""
+Per-process background threads
+gunicorn forks workers after the app is imported (--preload), and threads
+don't survive a fork, so each process starts its own on first use
+"""
+import os
+import threading
+
+
+class ProcessThread:
+    """Mixin for objects that run one daemon thread per process.
+    
+    Subclasses call __init__ with the thread's name, implement _run(), and
+    may override _on_start() to reset state inherited from the parent.
+    self._lock is shared with the subclass for its own bookkeeping.
+    """
+    
+    def __init__(self, thread_name):
+        self.thread_name = thread_name
+        self._lock = threading.Lock()
+        self._pid = None
+    
+    def ensure_started(self):
+        """Start this process's thread (once, and again after a fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._on_start()
+            threading.Thread(target=self._run, name=self.thread_name, daemon=True).start()
+            self._pid = os.getpid()
+    
+    def _on_start(self):
+        """Called under the lock just before this process's thread starts"""
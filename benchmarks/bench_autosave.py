@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Autosave throughput: /api/save-answer with and without the write-behind buffer
+
+Each process stands in for a gunicorn worker and runs one thread per
+simulated player. Every player is logged in through their invite link and
+keeps flipping random picks, like the last minutes before the deadline.
+Reports requests/s, latency and how many write transactions reached the
+database (one per click without the buffer, one per flush with it):
+
+    python benchmarks/bench_autosave.py --workers 2 --clients 32
+"""
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+
+from common import configure, make_database, percentile
+
+
+def worker(path, settings, clients, seconds, seed, results):
+    configure(path, WTF_CSRF_ENABLED=False, PROPS_WATCH_INTERVAL=0, **settings)
+    from app import app
+    from answer_buffer import answer_buffer
+    from database import PropQuestion, User
+    
+    players = User.get_participants()
+    questions = [question.id for question in PropQuestion.get_active()]
+    latencies, failures = [], 0
+    counts_lock = threading.Lock()
+    
+    def client(player, rng):
+        nonlocal failures
+        browser = app.test_client()
+        browser.get(f'/play/{player.access_token}')
+        mine, failed = [], 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            response = browser.post('/api/save-answer', json={
+                'question_id': rng.choice(questions), 'answer': rng.choice('AB')})
+            if response.status_code == 200 and response.get_json().get('success'):
+                mine.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        with counts_lock:
+            latencies.extend(mine)
+            failures += failed
+    
+    rng = random.Random(seed)
+    threads = [threading.Thread(target=client, args=(player, random.Random(rng.random())))
+               for player in rng.sample(players, clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # What the atexit hook does on shutdown: nothing queued is lost
+    answer_buffer.flush()
+    results.put((latencies, failures))
+
+
+def _write_transactions(path):
+    configure(path)
+    from database import CacheGenerations
+    # Every transaction that saves picks bumps the answers generation once
+    return CacheGenerations.get('answers')
+
+
+def run(write_behind, args):
+    settings = {'ANSWER_WRITE_BEHIND': write_behind}
+    path, cleanup = make_database(args.workers * args.clients, picks=False, **settings)
+    try:
+        before = _write_transactions(path)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [context.Process(target=worker,
+                                     args=(path, settings, args.clients, args.seconds, n, results))
+                     for n in range(args.workers)]
+        for process in processes:
+            process.start()
+        latencies, failures = [], 0
+        for _ in processes:
+            mine, failed = results.get()
+            latencies += mine
+            failures += failed
+        for process in processes:
+            process.join()
+        transactions = _write_transactions(path) - before
+    finally:
+        cleanup()
+    
+    label = 'buffered' if write_behind else 'direct'
+    print(f"{label:<9} {len(latencies) / args.seconds:>8.1f} saves/s   "
+          f"p50 {percentile(latencies, 0.5) * 1000:>6.1f} ms   "
+          f"p95 {percentile(latencies, 0.95) * 1000:>6.1f} ms   "
+          f"write transactions {transactions:>6}   failed {failures}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Autosave throughput with and without write-behind')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes (default: 2)')
+    parser.add_argument('--clients', type=int, default=32,
+                        help='Concurrent players per worker (default: 32)')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration per run (default: 10)')
+    args = parser.parse_args()
+    
+    print(f"{args.workers} workers x {args.clients} players, {args.seconds:g}s per run")
+    for write_behind in (False, True):
+        run(write_behind, args)
+
+
+if __name__ == '__main__':
+    main()
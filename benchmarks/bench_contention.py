@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark: N concurrent pick writers against the dashboard read path
+
+Writers and readers are separate processes, like gunicorn workers. Each
+writer saves single picks in their own transactions (the unbuffered
+/api/save-answer path); each reader runs the queries behind /dashboard in
+one read session. Run once per journal mode to compare:
+
+    python benchmarks/bench_contention.py --writers 8 --readers 4
+    python benchmarks/bench_contention.py --journal-mode DELETE WAL
+"""
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import time
+
+from common import configure, make_database, percentile
+
+
+def _dashboard_reads():
+    from database import (PropQuestion, User, UserAnswer, FreeformField,
+                          UserFreeformAnswer, Score)
+    PropQuestion.get_active()
+    players = User.get_participants()
+    UserAnswer.get_answers_for_users([user.id for user in players[:50]])
+    UserAnswer.get_pick_counts()
+    FreeformField.get_all()
+    UserFreeformAnswer.get_all_answers()
+    Score.get_leaderboard()
+
+
+def reader(path, settings, seconds, results):
+    configure(path, **settings)
+    from database import DatabaseSession, set_session_provider
+    
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        # One read session per "request", as the app does
+        db_session = DatabaseSession()
+        set_session_provider(lambda: db_session)
+        started = time.perf_counter()
+        try:
+            _dashboard_reads()
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            errors += 1
+        finally:
+            db_session.close()
+    results.put(('read', latencies, errors))
+
+
+def writer(path, settings, seconds, seed, results):
+    configure(path, **settings)
+    from database import PropQuestion, User, UserAnswer
+    
+    rng = random.Random(seed)
+    users = [user.id for user in User.get_participants()]
+    questions = [question.id for question in PropQuestion.get_active()]
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            UserAnswer.save_answer(rng.choice(users), rng.choice(questions), rng.choice('AB'))
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            # "database is locked" once the busy timeout runs out
+            errors += 1
+    results.put(('write', latencies, errors))
+
+
+def run(journal_mode, args):
+    settings = {'SQLITE_JOURNAL_MODE': journal_mode}
+    path, cleanup = make_database(args.players, **settings)
+    try:
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = ([context.Process(target=writer, args=(path, settings, args.seconds, n, results))
+                      for n in range(args.writers)]
+                     + [context.Process(target=reader, args=(path, settings, args.seconds, results))
+                        for _ in range(args.readers)])
+        for process in processes:
+            process.start()
+        
+        totals = {'read': ([], 0), 'write': ([], 0)}
+        for _ in processes:
+            kind, latencies, errors = results.get()
+            totals[kind] = (totals[kind][0] + latencies, totals[kind][1] + errors)
+        for process in processes:
+            process.join()
+    finally:
+        cleanup()
+    
+    for kind in ('write', 'read'):
+        latencies, errors = totals[kind]
+        print(f"{journal_mode:<8} {kind + 's':<6} {len(latencies) / args.seconds:>9.1f}/s   "
+              f"p50 {percentile(latencies, 0.5) * 1000:>7.1f} ms   "
+              f"p95 {percentile(latencies, 0.95) * 1000:>7.1f} ms   "
+              f"max {max(latencies, default=0) * 1000:>7.1f} ms   locked errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent writers vs. the dashboard read path')
+    parser.add_argument('--writers', type=int, default=8, help='Writer processes (default: 8)')
+    parser.add_argument('--readers', type=int, default=4, help='Reader processes (default: 4)')
+    parser.add_argument('--players', type=int, default=500, help='Players in the pool (default: 500)')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration per run (default: 10)')
+    parser.add_argument('--journal-mode', nargs='+', default=['DELETE', 'WAL'],
+                        help='Journal modes to compare (default: DELETE WAL)')
+    args = parser.parse_args()
+    
+    print(f"{args.writers} writers, {args.readers} readers, {args.players} players, "
+          f"{args.seconds:g}s per run")
+    for journal_mode in args.journal_mode:
+        run(journal_mode.upper(), args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Grading at large pool sizes
+
+For each pool size, grades the props one at a time through
+PropQuestion.grade (Score.apply_grade shifts correct and max_possible for
+the players who picked the question), flips a few grades to time a
+correction, and after every change reads Score.get_leaderboard() cold, with
+its clinch/elimination status and magic numbers. Score.rebuild, the
+full rescore, is timed for comparison:
+
+    python benchmarks/bench_grading.py --players 10000 50000
+"""
+import argparse
+import time
+
+from common import make_database, percentile
+
+
+def timed(work):
+    started = time.perf_counter()
+    work()
+    return time.perf_counter() - started
+
+
+def report(label, timings):
+    print(f"  {label:<22} p50 {percentile(timings, 0.5) * 1000:>8.1f} ms   "
+          f"p95 {percentile(timings, 0.95) * 1000:>8.1f} ms   "
+          f"max {max(timings) * 1000:>8.1f} ms   ({len(timings)} runs)")
+
+
+def run(players, corrections):
+    path, cleanup = make_database(players)
+    try:
+        from database import PropQuestion, Score
+        
+        questions = [question.id for question in PropQuestion.get_active()]
+        grades, flips, leaderboards = [], [], []
+        for question_id in questions:
+            grades.append(timed(lambda: PropQuestion.grade({question_id: 'A'})))
+            leaderboards.append(timed(Score.get_leaderboard))
+        for question_id in questions[:corrections]:
+            flips.append(timed(lambda: PropQuestion.grade({question_id: 'B'})))
+            leaderboards.append(timed(Score.get_leaderboard))
+        warm = [timed(Score.get_leaderboard) for _ in range(5)]
+        rebuild = [timed(Score.rebuild) for _ in range(3)]
+        
+        statuses = {}
+        for _, score in Score.get_leaderboard():
+            statuses[score['status']] = statuses.get(score['status'], 0) + 1
+    finally:
+        cleanup()
+    
+    print(f"{players} players, {len(questions)} props "
+          f"({', '.join(f'{n} {status}' for status, n in sorted(statuses.items()))})")
+    report('grade one prop', grades)
+    report('correct a grade', flips)
+    report('leaderboard (cold)', leaderboards)
+    report('leaderboard (cached)', warm)
+    report('full rebuild', rebuild)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grading and leaderboard cost at large pool sizes')
+    parser.add_argument('--players', type=int, nargs='+', default=[10000, 50000],
+                        help='Pool sizes to measure (default: 10000 50000)')
+    parser.add_argument('--corrections', type=int, default=5,
+                        help='Grades flipped after the key is in (default: 5)')
+    args = parser.parse_args()
+    
+    for players in args.players:
+        run(players, args.corrections)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Scoring everyone from bit-packed pick vectors vs. counting matches in SQL
+
+With half the props graded, times a full-pool score three ways:
+
+- sql: join user_answers to prop_questions on the correct answer and
+  count per player (what scoring looked like before the vectors)
+- vectors: load every player's vector from pick_vectors and score it
+- score: score vectors already in memory (the popcounts alone)
+
+    python benchmarks/bench_pick_vectors.py --players 10000 100000
+"""
+import argparse
+import time
+
+from common import make_database
+
+SQL_SCORES = '''
+    SELECT ua.user_id, COUNT(*) AS correct
+    FROM user_answers ua
+    JOIN prop_questions q ON q.id = ua.question_id
+    WHERE q.is_active = 1 AND ua.answer = q.correct_answer
+    GROUP BY ua.user_id
+'''
+
+
+def best_of(repeat, work):
+    """Run work() repeat times; returns (fastest seconds, last result)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = work()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run(players, repeat):
+    path, cleanup = make_database(players)
+    try:
+        from database import PickVectors, PropQuestion, get_db_connection
+        questions = PropQuestion.get_active()
+        PropQuestion.grade({question.id: 'A' for question in questions[::2]})
+        
+        conn = get_db_connection()
+        try:
+            def sql():
+                return {row['user_id']: row['correct'] for row in conn.execute(SQL_SCORES)}
+            
+            def vectors():
+                key = PickVectors.load_key(conn)
+                return {user_id: PickVectors.score(vector, key)[0]
+                        for user_id, vector in PickVectors.load(conn).items()}
+            
+            loaded = PickVectors.load(conn)
+            key = PickVectors.load_key(conn)
+            
+            def score():
+                return {user_id: PickVectors.score(vector, key)[0]
+                        for user_id, vector in loaded.items()}
+            
+            sql_time, expected = best_of(repeat, sql)
+            results = {'sql': sql_time}
+            for name, work in (('vectors', vectors), ('score', score)):
+                results[name], scores = best_of(repeat, work)
+                # Players with no correct pick have no row in the SQL count
+                assert {user_id: n for user_id, n in scores.items() if n} == expected
+        finally:
+            conn.close()
+    finally:
+        cleanup()
+    
+    print(f"{players:>8} players   " + '   '.join(f"{name} {seconds * 1000:>8.1f} ms"
+                                                  for name, seconds in results.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-pool scoring: pick vectors vs. SQL')
+    parser.add_argument('--players', type=int, nargs='+', default=[10000, 100000],
+                        help='Pool sizes to measure (default: 10000 100000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per method, fastest kept (default: 5)')
+    args = parser.parse_args()
+    
+    for players in args.players:
+        run(players, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Per-request connection cost: one dashboard's worth of model calls
+
+Times the model calls behind a dashboard render three ways:
+
+- connect: a fresh sqlite3.connect() (and its PRAGMAs) for every call, as
+  get_db_connection() did before the pool
+- pool: every call borrows a pooled connection and hands it back
+- session: one pooled connection and read transaction for the whole
+  request, as the app runs today
+
+    python benchmarks/bench_pool.py --players 100 --requests 2000
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from common import make_database, percentile
+
+
+def _connect_per_call():
+    """get_db_connection() as it was before the pool"""
+    from config import Config
+    from database import PooledConnection, configure_connection
+    
+    os.makedirs(os.path.dirname(Config.DATABASE_PATH), exist_ok=True)
+    conn = sqlite3.connect(Config.DATABASE_PATH, factory=PooledConnection)
+    conn.row_factory = sqlite3.Row
+    configure_connection(conn)
+    return conn
+
+
+def _dashboard_calls(user_id):
+    from database import (FreeformField, PropQuestion, Score, Settings, User,
+                          UserAnswer)
+    Settings.is_locked()
+    Settings.get_lock_time()
+    PropQuestion.get_active()
+    PropQuestion.get_by_category()
+    User.get_participants()
+    FreeformField.get_all()
+    UserAnswer.get_user_answers(user_id)
+    Score.get_leaderboard()
+
+
+def run(mode, user_id, requests):
+    """Time requests in one mode; returns (latencies, connections opened)"""
+    import database
+    from database import DatabaseSession, get_db_connection, set_session_provider
+    
+    opened = 0
+    
+    def counting_connect():
+        nonlocal opened
+        opened += 1
+        return _connect_per_call()
+    
+    pool = database.get_pool()
+    pool_connect = pool._connect
+    
+    def counting_pool_connect():
+        nonlocal opened
+        opened += 1
+        return pool_connect()
+    
+    pool.close_all()
+    database.get_db_connection = counting_connect if mode == 'connect' else get_db_connection
+    pool._connect = counting_pool_connect
+    latencies = []
+    try:
+        for _ in range(requests):
+            db_session = DatabaseSession() if mode == 'session' else None
+            set_session_provider(lambda: db_session)
+            started = time.perf_counter()
+            try:
+                _dashboard_calls(user_id)
+            finally:
+                if db_session is not None:
+                    db_session.close()
+            latencies.append(time.perf_counter() - started)
+    finally:
+        database.get_db_connection = get_db_connection
+        pool._connect = pool_connect
+        set_session_provider(None)
+    return latencies, opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Connection cost of a dashboard request')
+    parser.add_argument('--players', type=int, default=100, help='Players in the pool (default: 100)')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per mode (default: 2000)')
+    args = parser.parse_args()
+    
+    path, cleanup = make_database(args.players)
+    try:
+        from database import User
+        user_id = User.get_participants()[0].id
+        print(f"{args.players} players, {args.requests} requests per mode")
+        run('session', user_id, 50)  # Warm the page cache and the model caches
+        for mode in ('connect', 'pool', 'session'):
+            latencies, opened = run(mode, user_id, args.requests)
+            print(f"{mode:<8} {sum(latencies) / len(latencies) * 1000:>7.3f} ms/request   "
+                  f"p95 {percentile(latencies, 0.95) * 1000:>7.3f} ms   "
+                  f"{len(latencies) / sum(latencies):>6.0f} requests/s   "
+                  f"connections opened {opened}")
+    finally:
+        cleanup()
+
+
+if __name__ == '__main__':
+    main()
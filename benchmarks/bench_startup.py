@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Startup cost: importing the app and booting gunicorn workers
+
+In a fresh interpreter, times `import app` and create_app(), then times
+gunicorn with gunicorn.conf.py from launch to its first /healthz response,
+with and without --preload. Each is measured on a fresh database (first
+deploy) and again on the database that run left behind (a restart).
+
+--before REV also measures the tree at REV, extracted with git archive,
+e.g. the commit before the one-shot bootstrap, when importing app.py still
+migrated the database and checked the admin in every process:
+
+    python benchmarks/bench_startup.py --before 6d6d15a^
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from common import ROOT, percentile
+
+IMPORT_TIMER = '''
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+if hasattr(app, 'create_app'):
+    app.create_app()
+print(imported - started, time.perf_counter() - imported if hasattr(app, 'create_app') else -1)
+'''
+
+
+def extract(rev):
+    """Check rev out into a temp dir; returns its path"""
+    directory = tempfile.mkdtemp(prefix='props-startup-')
+    archive = subprocess.run(['git', 'archive', rev], cwd=ROOT, check=True, capture_output=True).stdout
+    subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+    return directory
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def environment(database, **extra):
+    return dict(os.environ, DATABASE_PATH=database, PROPS_WATCH_INTERVAL='0',
+                WIN_PROB_WORKERS='0', **extra)
+
+
+def reset(tree, database):
+    """Remove the database (trees from before DATABASE_PATH keep it in data/)"""
+    shutil.rmtree(os.path.dirname(database), ignore_errors=True)
+    os.makedirs(os.path.dirname(database))
+    if tree != ROOT:
+        shutil.rmtree(os.path.join(tree, 'data'), ignore_errors=True)
+
+
+def exists(tree, database):
+    return os.path.exists(database) or (tree != ROOT and os.path.exists(os.path.join(tree, 'data')))
+
+
+def time_import(tree, database):
+    """Seconds to import app.py and to call create_app() (None if there is none)"""
+    result = subprocess.run([sys.executable, '-c', IMPORT_TIMER], cwd=tree, env=environment(database),
+                            check=True, capture_output=True, text=True)
+    imported, created = (float(value) for value in result.stdout.split()[-2:])
+    return imported, created if created >= 0 else None
+
+
+def time_boot(tree, database, preload, workers):
+    """Seconds from launching gunicorn to its first /healthz 200"""
+    port = free_port()
+    env = environment(database, GUNICORN_BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(workers),
+                      GUNICORN_PRELOAD='1' if preload else '0')
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app']
+    started = time.perf_counter()
+    process = subprocess.Popen(command + (['--preload'] if preload else []), cwd=tree, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while process.poll() is None:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/healthz', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError('gunicorn exited during startup')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure(label, tree, args):
+    print(label)
+    database = os.path.join(tempfile.mkdtemp(prefix='props-startup-db-'), 'startup.db')
+    try:
+        for fresh in (True, False):
+            imports, creates, touched = [], [], False
+            boots = {False: [], True: []}
+            for _ in range(args.repeat):
+                reset(tree, database)
+                if not fresh:
+                    # Leave a bootstrapped database behind, as the last deploy would
+                    time_boot(tree, database, True, 1)
+                imported, created = time_import(tree, database)
+                imports.append(imported)
+                creates.append(created)
+                touched = touched or (fresh and exists(tree, database))
+                for preload in (False, True):
+                    if fresh:
+                        reset(tree, database)
+                    boots[preload].append(time_boot(tree, database, preload, args.workers))
+            
+            create = ('n/a' if None in creates
+                      else f"{percentile(creates, 0.5) * 1000:.1f} ms")
+            print(f"  {'fresh' if fresh else 'existing'} database: "
+                  f"import app {percentile(imports, 0.5) * 1000:.1f} ms, "
+                  f"create_app() {create}, "
+                  f"boot {percentile(boots[False], 0.5) * 1000:.0f} ms, "
+                  f"boot --preload {percentile(boots[True], 0.5) * 1000:.0f} ms"
+                  + (' (importing created the database)' if touched else ''))
+    finally:
+        shutil.rmtree(os.path.dirname(database), ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import and worker boot time')
+    parser.add_argument('--before', metavar='REV', help='Also measure the tree at this git revision')
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers (default: 2)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement, median kept (default: 5)')
+    args = parser.parse_args()
+    
+    if args.before:
+        tree = extract(args.before)
+        try:
+            measure(f"before ({args.before})", tree, args)
+        finally:
+            shutil.rmtree(tree, ignore_errors=True)
+    measure('after (working tree)', ROOT, args)
+
+
+if __name__ == '__main__':
+    main()
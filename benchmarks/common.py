@@ -0,0 +1,54 @@
+"""
+Shared setup for the benchmarks: a throwaway database seeded with players,
+the props from props_config.json and a spread of picks
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project directory to the path
+sys.path.insert(0, ROOT)
+
+from config import Config
+
+
+def configure(path, **settings):
+    """Point this process at a benchmark database (call before any DB use)"""
+    Config.DATABASE_PATH = path
+    for name, value in settings.items():
+        setattr(Config, name, value)
+
+
+def make_database(players, picks=True, **settings):
+    """Create and seed a database in a temp dir; returns (path, cleanup)"""
+    directory = tempfile.mkdtemp(prefix='props-bench-')
+    path = os.path.join(directory, 'bench.db')
+    configure(path, **settings)
+    
+    from database import init_db, get_pool, User, PropQuestion, UserAnswer
+    from props_loader import load_config, import_config
+    
+    init_db()
+    import_config(load_config())
+    User.create_many([f'Player {n}' for n in range(players)])
+    if picks:
+        rng = random.Random(0)
+        now = datetime.utcnow().isoformat()
+        questions = [question.id for question in PropQuestion.get_active()]
+        UserAnswer.save_many([(user.id, question_id, rng.choice('AB'), now)
+                              for user in User.get_participants()
+                              for question_id in questions])
+    get_pool().close_all()
+    return path, lambda: shutil.rmtree(directory, ignore_errors=True)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
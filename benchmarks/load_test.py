@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Load test: how many idle and active clients a 2-worker deployment holds
+
+Starts gunicorn with gunicorn.conf.py on a throwaway database (picks locked,
+so the dashboard and its live stream are open) and runs three kinds of
+client against it at once:
+
+  idle     open pick-form tabs: one /api/lock-status check per --idle-every s
+  streams  open dashboards holding an /api/stream connection
+  active   players clicking around: /dashboard and /api/standings back to back
+
+Like browsers, clients revalidate with the ETag they last got, so an
+unchanged page costs a 304.
+and reports per client kind how many requests completed, failed or timed
+out, their latency, and how many live streams were accepted or turned away.
+Compare the old sync workers with the threaded default:
+
+    python benchmarks/load_test.py --serve sync gthread
+    python benchmarks/load_test.py --idle 2000 --streams 200 --active 64
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import ROOT, make_database, percentile
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.failed = 0
+        self.timed_out = 0
+        self.accepted = 0
+        self.turned_away = 0
+    
+    def line(self, seconds):
+        return (f"{len(self.latencies):>6} ok ({len(self.latencies) / seconds:>7.1f}/s)  "
+                f"failed {self.failed:>5}  timeouts {self.timed_out:>5}  "
+                f"p50 {percentile(self.latencies, 0.5) * 1000:>7.1f} ms  "
+                f"p95 {percentile(self.latencies, 0.95) * 1000:>7.1f} ms")
+
+
+async def http_get(port, path, cookies='', timeout=10.0, etag=None):
+    """One GET on a fresh connection; returns (status, headers, body)"""
+    async def exchange():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            revalidate = f'If-None-Match: {etag}\r\n' if etag else ''
+            writer.write((f'GET {path} HTTP/1.1\r\nHost: localhost\r\nCookie: {cookies}\r\n'
+                          f'{revalidate}Connection: close\r\n\r\n').encode())
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        headers = [tuple(part.strip() for part in line.split(':', 1)) for line in lines[1:]]
+        return int(lines[0].split()[1]), headers, body
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+def _set_cookies(jar, headers):
+    for name, value in headers:
+        if name.lower() == 'set-cookie':
+            key, _, rest = value.partition('=')
+            jar[key] = rest.split(';', 1)[0]
+
+
+async def login(port, token):
+    """Follow an invite link and return the session cookies it leaves.
+    
+    The redirect is followed too, so the welcome message is shown and
+    cleared; pages carrying a flashed message are never answered with 304.
+    """
+    jar = {}
+    _, headers, _ = await http_get(port, f'/play/{token}', timeout=60)
+    _set_cookies(jar, headers)
+    location = next(value for name, value in headers if name.lower() == 'location')
+    _, headers, _ = await http_get(port, location, '; '.join(f'{k}={v}' for k, v in jar.items()),
+                                   timeout=60)
+    _set_cookies(jar, headers)
+    return '; '.join(f'{key}={value}' for key, value in jar.items())
+
+
+async def timed_get(port, path, cookies, stats, etags):
+    """GET like a browser does: revalidating with the ETag it last got"""
+    started = time.perf_counter()
+    try:
+        status, headers, _ = await http_get(port, path, cookies, etag=etags.get(path))
+    except asyncio.TimeoutError:
+        stats.timed_out += 1
+        return
+    except OSError:
+        stats.failed += 1
+        return
+    if status < 400:
+        stats.latencies.append(time.perf_counter() - started)
+        etags.update((path, value) for name, value in headers if name.lower() == 'etag')
+    else:
+        stats.failed += 1
+
+
+async def idle_client(port, cookies, every, deadline, stats):
+    etags = {}
+    await asyncio.sleep(random.uniform(0, every))
+    while time.monotonic() < deadline:
+        await timed_get(port, '/api/lock-status', cookies, stats, etags)
+        await asyncio.sleep(every)
+
+
+async def active_client(port, cookies, deadline, stats):
+    paths = ['/dashboard', '/api/standings']
+    etags = {}
+    while time.monotonic() < deadline:
+        await timed_get(port, random.choice(paths), cookies, stats, etags)
+
+
+async def stream_client(port, cookies, deadline, stats):
+    """Hold a live stream open until the deadline, reconnecting like EventSource"""
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection('127.0.0.1', port), 10)
+        except (asyncio.TimeoutError, OSError):
+            stats.failed += 1
+            await asyncio.sleep(3)
+            continue
+        retry = 3
+        try:
+            writer.write((f'GET /api/stream HTTP/1.1\r\nHost: localhost\r\nCookie: {cookies}\r\n'
+                          f'Accept: text/event-stream\r\n\r\n').encode())
+            await writer.drain()
+            received = b''
+            while b'retry:' not in received:
+                chunk = await asyncio.wait_for(reader.read(4096), 10)
+                if not chunk:
+                    break
+                received += chunk
+            if b'retry: 3000' in received:
+                stats.accepted += 1
+                stats.latencies.append(time.perf_counter() - started)
+                # Stay connected (reading keep-alives) until the server ends it
+                while time.monotonic() < deadline:
+                    chunk = await asyncio.wait_for(reader.read(4096),
+                                                   max(0.1, deadline - time.monotonic()))
+                    if not chunk:
+                        break
+            elif b'retry:' in received:
+                stats.turned_away += 1
+                retry = 15
+            else:
+                stats.failed += 1
+        except asyncio.TimeoutError:
+            if time.monotonic() < deadline:
+                stats.timed_out += 1
+        except OSError:
+            stats.failed += 1
+        finally:
+            writer.close()
+        if time.monotonic() < deadline:
+            await asyncio.sleep(retry)
+
+
+async def wait_until_up(port, process):
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            status, _, _ = await http_get(port, '/healthz', timeout=1)
+            if status == 200:
+                return
+        except (OSError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError('gunicorn did not come up')
+
+
+async def drive(port, process, tokens, args):
+    await wait_until_up(port, process)
+    
+    # Log everyone in first (a few at a time) so the run measures steady state
+    gate = asyncio.Semaphore(16)
+    
+    async def gated_login(token):
+        async with gate:
+            return await login(port, token)
+    cookies = await asyncio.gather(*(gated_login(token) for token in tokens))
+    
+    idle, streams, active = Stats(), Stats(), Stats()
+    deadline = time.monotonic() + args.seconds
+    # Clients take turns with the players' logins (several tabs per player)
+    clients = (cookies[n % len(cookies)] for n in range(args.idle + args.streams + args.active))
+    tasks = ([idle_client(port, next(clients), args.idle_every, deadline, idle)
+              for _ in range(args.idle)]
+             + [stream_client(port, next(clients), deadline, streams) for _ in range(args.streams)]
+             + [active_client(port, next(clients), deadline, active) for _ in range(args.active)])
+    await asyncio.gather(*tasks)
+    return idle, streams, active
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run(worker_class, args):
+    path, cleanup = make_database(args.players, picks=True)
+    from database import Settings, User, get_pool
+    Settings.set_lock_time(datetime.now() - timedelta(days=1))
+    tokens = [user.access_token for user in User.get_participants()]
+    get_pool().close_all()
+    
+    port = free_port()
+    env = dict(os.environ,
+               DATABASE_PATH=path,
+               GUNICORN_BIND=f'127.0.0.1:{port}',
+               WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_WORKER_CLASS=worker_class,
+               GUNICORN_THREADS=str(args.threads if worker_class == 'gthread' else 1),
+               PROPS_WATCH_INTERVAL='0',
+               WIN_PROB_WORKERS='0')
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                               cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        idle, streams, active = asyncio.run(drive(port, process, tokens, args))
+    finally:
+        process.terminate()
+        process.wait()
+        cleanup()
+    
+    threads = args.threads if worker_class == 'gthread' else 1
+    print(f"\n{worker_class}: {args.workers} workers x {threads} threads, {args.players} players, "
+          f"{args.idle} idle / {args.streams} streaming / {args.active} active clients")
+    print(f"  idle     {idle.line(args.seconds)}")
+    print(f"  active   {active.line(args.seconds)}")
+    print(f"  streams  accepted {streams.accepted}, turned away {streams.turned_away}, "
+          f"failed {streams.failed}, timeouts {streams.timed_out}, "
+          f"p95 connect {percentile(streams.latencies, 0.95) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent idle + active clients against gunicorn')
+    parser.add_argument('--serve', nargs='+', default=['sync', 'gthread'],
+                        help='Worker classes to compare (default: sync gthread)')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes (default: 2)')
+    parser.add_argument('--threads', type=int, default=128,
+                        help='Threads per gthread worker (default: 128)')
+    parser.add_argument('--players', type=int, default=100,
+                        help='Players in the pool; sets the dashboard size (default: 100)')
+    parser.add_argument('--idle', type=int, default=1000, help='Idle pick-form tabs (default: 1000)')
+    parser.add_argument('--idle-every', type=float, default=30,
+                        help='Seconds between idle lock-status checks (default: 30)')
+    parser.add_argument('--streams', type=int, default=100,
+                        help='Dashboards holding a live stream (default: 100)')
+    parser.add_argument('--active', type=int, default=32, help='Active clients (default: 32)')
+    parser.add_argument('--seconds', type=float, default=30, help='Duration per run (default: 30)')
+    args = parser.parse_args()
+    
+    for worker_class in args.serve:
+        run(worker_class, args)
+
+
+if __name__ == '__main__':
+    main()
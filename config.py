@@ -12,7 +12,59 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'super-bowl-props-secret-key-change-in-production'
     
     # Database configuration
-    DATABASE_PATH = os.path.join(basedir, 'data', 'superbowl_props.db')
+    DATABASE_PATH = os.environ.get('DATABASE_PATH') or os.path.join(basedir, 'data', 'superbowl_props.db')
+    
+    # Max idle SQLite connections kept open per worker process. Live streams
+    # give their connection back, so this covers the threads serving ordinary
+    # requests (GUNICORN_THREADS - LIVE_MAX_STREAMS) plus background threads;
+    # beyond it connections are closed on release and reopened when needed.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 32))
+    
+    # SQLite tuning for concurrent gunicorn workers. WAL lets readers run
+    # alongside a writer; synchronous=NORMAL is durable across app crashes
+    # in WAL mode and only fsyncs at checkpoints.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 8192))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024))
+    # Where sorts and materialized subqueries spill: DEFAULT (temp files),
+    # FILE or MEMORY. MEMORY keeps e.g. a sorted export entirely in RAM.
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE', 'DEFAULT')
+    
+    # Autosaved picks are buffered per worker and written in one transaction
+    # every ANSWER_FLUSH_INTERVAL seconds instead of one commit per click
+    ANSWER_WRITE_BEHIND = os.environ.get('ANSWER_WRITE_BEHIND', 'true').lower() == 'true'
+    ANSWER_FLUSH_INTERVAL = float(os.environ.get('ANSWER_FLUSH_INTERVAL', 0.25))
+    
+    # Players per page in the dashboard's picks tabs
+    DASHBOARD_PICKS_PAGE_SIZE = int(os.environ.get('DASHBOARD_PICKS_PAGE_SIZE', 50))
+    
+    # Live updates (Server-Sent Events). Each worker's hub polls for changes
+    # once per LIVE_POLL_INTERVAL no matter how many clients are connected.
+    # Streams are closed after LIVE_STREAM_MAX_SECONDS and the browser
+    # reconnects, so a stream never holds a worker indefinitely.
+    LIVE_POLL_INTERVAL = float(os.environ.get('LIVE_POLL_INTERVAL', 1.0))
+    LIVE_HEARTBEAT_SECONDS = int(os.environ.get('LIVE_HEARTBEAT_SECONDS', 15))
+    LIVE_STREAM_MAX_SECONDS = int(os.environ.get('LIVE_STREAM_MAX_SECONDS', 300))
+    LIVE_CLIENT_BUFFER = int(os.environ.get('LIVE_CLIENT_BUFFER', 32))
+    # Streams allowed per worker. Each open stream holds one gunicorn thread,
+    # so keep this below GUNICORN_THREADS (128) so live updates can never
+    # starve ordinary page requests; see benchmarks/load_test.py for sizing
+    LIVE_MAX_STREAMS = int(os.environ.get('LIVE_MAX_STREAMS', 100))
+    
+    # Win probabilities: unresolved props are enumerated exactly when at most
+    # WIN_PROB_EXACT_MAX_PROPS remain, otherwise WIN_PROB_SAMPLES Monte Carlo
+    # games are simulated across WIN_PROB_WORKERS processes (0 = in-process).
+    # WIN_PROB_PRIORS is 'picks' (odds follow how the pool picked) or 'even'.
+    WIN_PROB_PRIORS = os.environ.get('WIN_PROB_PRIORS', 'picks')
+    WIN_PROB_EXACT_MAX_PROPS = int(os.environ.get('WIN_PROB_EXACT_MAX_PROPS', 12))
+    WIN_PROB_SAMPLES = int(os.environ.get('WIN_PROB_SAMPLES', 20000))
+    WIN_PROB_WORKERS = int(os.environ.get('WIN_PROB_WORKERS', min(4, os.cpu_count() or 1)))
+    
+    # Seconds between checks of props_config.json for edits (0 = off); an
+    # unchanged file costs one stat() per check
+    PROPS_WATCH_INTERVAL = float(os.environ.get('PROPS_WATCH_INTERVAL', 2.0))
     
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
@@ -4,6 +4,9 @@ Uses SQLite for minimal dependencies
 """
 import sqlite3
 import os
+import secrets
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 try:
     from zoneinfo import ZoneInfo
@@ -24,98 +27,344 @@ TIMEZONE_CHOICES = [
 
 DEFAULT_TIMEZONE = 'US/Pacific'
 
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+TEMP_STORE_MODES = ('DEFAULT', 'FILE', 'MEMORY')
+
+
+def _pragma_choice(value, choices, name):
+    value = str(value).upper()
+    if value not in choices:
+        raise ValueError(f"Invalid {name} {value!r}; expected one of {', '.join(choices)}")
+    return value
+
+
+def configure_connection(conn):
+    """Apply the per-connection pragmas from Config"""
+    synchronous = _pragma_choice(Config.SQLITE_SYNCHRONOUS, SYNCHRONOUS_MODES, 'SQLITE_SYNCHRONOUS')
+    temp_store = _pragma_choice(Config.SQLITE_TEMP_STORE, TEMP_STORE_MODES, 'SQLITE_TEMP_STORE')
+    conn.execute(f'PRAGMA busy_timeout = {int(Config.SQLITE_BUSY_TIMEOUT_MS)}')
+    conn.execute(f'PRAGMA synchronous = {synchronous}')
+    # Negative cache_size is in KiB rather than pages
+    conn.execute(f'PRAGMA cache_size = -{int(Config.SQLITE_CACHE_SIZE_KB)}')
+    conn.execute(f'PRAGMA mmap_size = {int(Config.SQLITE_MMAP_SIZE)}')
+    conn.execute(f'PRAGMA temp_store = {temp_store}')
+
+
+def configure_journal_mode(conn):
+    """Set the (persistent) journal mode from Config; returns the active mode"""
+    mode = _pragma_choice(Config.SQLITE_JOURNAL_MODE, JOURNAL_MODES, 'SQLITE_JOURNAL_MODE')
+    return conn.execute(f'PRAGMA journal_mode = {mode}').fetchone()[0]
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection that hands itself back to its pool on close()"""
+    
+    pool = None
+    
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+    
+    def dispose(self):
+        """Really close the underlying connection"""
+        self.pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """Per-process pool of pre-configured SQLite connections.
+    
+    Connections are opened with check_same_thread=False so any thread in the
+    worker can borrow them, but a connection is only ever used by one borrower
+    at a time. After a fork (gunicorn workers) the child starts a fresh pool
+    instead of reusing connections opened by the parent.
+    """
+    
+    def __init__(self, path, max_idle=None):
+        self.path = path
+        self.max_idle = Config.DB_POOL_SIZE if max_idle is None else max_idle
+        self._idle = []
+        self._inherited = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            # Never touch SQLite handles opened in the parent process; keep a
+            # reference so they are not closed by the garbage collector either.
+            self._inherited.extend(self._idle)
+            self._idle = []
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, factory=PooledConnection,
+                               timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        configure_connection(conn)
+        conn.pool = self
+        return conn
+    
+    def acquire(self):
+        """Borrow a connection, opening a new one if none are idle"""
+        self._check_fork()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+    
+    def release(self, conn):
+        """Return a connection to the pool, discarding any open transaction"""
+        if self._pid != os.getpid():
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.dispose()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.dispose()
+    
+    def close_all(self):
+        """Close every idle connection (e.g. on shutdown or in tests)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.dispose()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool():
+    """Get the connection pool for the configured database path"""
+    path = Config.DATABASE_PATH
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = _pools[path] = ConnectionPool(path)
+    return pool
+
 
 def get_db_connection():
-    """Get a database connection with row factory enabled"""
-    os.makedirs(os.path.dirname(Config.DATABASE_PATH), exist_ok=True)
-    conn = sqlite3.connect(Config.DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Borrow a pooled database connection (row factory enabled).
+    
+    Calling close() on the returned connection hands it back to the pool.
+    """
+    return get_pool().acquire()
 
 
-def init_db():
-    """Initialize the database with all required tables"""
+class DatabaseSession:
+    """Unit of work: one pooled connection and one transaction.
+    
+    The connection is borrowed lazily on first use. Read sessions open a
+    deferred transaction so every query sees the same snapshot; write
+    sessions take the write lock up front (BEGIN IMMEDIATE) so they never
+    fail halfway through on a lock upgrade.
+    """
+    
+    def __init__(self, write=False):
+        self.write = write
+        self.cache = {}
+        self._conn = None
+    
+    @property
+    def is_open(self):
+        return self._conn is not None
+    
+    @property
+    def connection(self):
+        if self._conn is None:
+            conn = get_db_connection()
+            conn.execute('BEGIN IMMEDIATE' if self.write else 'BEGIN')
+            self._conn = conn
+        return self._conn
+    
+    def begin_write(self):
+        """Switch a read session to a write transaction before its first write.
+        
+        For read-only endpoints that only sometimes write: the read snapshot
+        is ended (nothing was written under it) and the write lock taken, so
+        the write cannot fail on a lock upgrade. No-op for write sessions.
+        """
+        if self.write:
+            return
+        self.write = True
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.execute('BEGIN IMMEDIATE')
+    
+    def commit(self):
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.commit()
+    
+    def rollback(self):
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.rollback()
+    
+    def close(self):
+        """Roll back anything uncommitted and return the connection"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            conn.close()
+
+
+_session_provider = None
+
+
+def set_session_provider(provider):
+    """Register a callable returning the active DatabaseSession (or None).
+    
+    The web app uses this to scope one session to each Flask request.
+    """
+    global _session_provider
+    _session_provider = provider
+
+
+def current_session():
+    """Get the active DatabaseSession, if any"""
+    if _session_provider is None:
+        return None
+    return _session_provider()
+
+
+@contextmanager
+def db_connection():
+    """Yield a connection for a model operation.
+    
+    Inside a session the session's connection is used and the caller owns
+    the transaction. Otherwise a pooled connection is borrowed and the work
+    is committed on success (rolled back on error).
+    """
+    session = current_session()
+    if session is not None:
+        yield session.connection
+        return
+    
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Users table - simplified with access token auth
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            display_name TEXT NOT NULL,
-            access_token TEXT UNIQUE NOT NULL,
-            is_admin INTEGER DEFAULT 0,
-            admin_password TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            last_visit TEXT
-        )
-    ''')
-    
-    # Settings table for app-wide settings
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Prop questions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS prop_questions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            category TEXT NOT NULL,
-            question TEXT NOT NULL,
-            option_a TEXT NOT NULL,
-            option_b TEXT NOT NULL,
-            correct_answer TEXT,
-            display_order INTEGER DEFAULT 0,
-            is_active INTEGER DEFAULT 1
-        )
-    ''')
-    
-    # User answers table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_answers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            question_id INTEGER NOT NULL,
-            answer TEXT NOT NULL,
-            submitted_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            FOREIGN KEY (question_id) REFERENCES prop_questions (id),
-            UNIQUE (user_id, question_id)
-        )
-    ''')
-    
-    # Freeform fields table (for tiebreakers, etc.)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS freeform_fields (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            field_id TEXT UNIQUE NOT NULL,
-            label TEXT NOT NULL,
-            field_type TEXT DEFAULT 'number',
-            placeholder TEXT,
-            correct_value TEXT,
-            display_order INTEGER DEFAULT 0
-        )
-    ''')
-    
-    # User freeform answers table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_freeform_answers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            field_id TEXT NOT NULL,
-            value TEXT NOT NULL,
-            submitted_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            UNIQUE (user_id, field_id)
-        )
-    ''')
+    try:
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class CacheGenerations:
+    """Cross-worker cache coherence channel.
+    
+    Every named cache (settings, questions, teams, scores, ...) has a
+    monotonic counter in the cache_generations table. Writers bump the
+    counter in the same transaction as the data change; readers fetch all
+    counters in one query (once per request inside a session) and call the
+    subscribers of any cache whose counter moved since this process last
+    looked. Because the counters live in the database, every gunicorn
+    worker observes a change as soon as it commits.
+    """
+    
+    _seen = {}
+    _subscribers = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def subscribe(name, callback):
+        """Call callback() whenever the named cache is invalidated"""
+        with CacheGenerations._lock:
+            CacheGenerations._subscribers.setdefault(name, []).append(callback)
+    
+    @staticmethod
+    def sync():
+        """Get {name: generation}, notifying subscribers of changed caches"""
+        session = current_session()
+        if session is not None and 'generations' in session.cache:
+            return session.cache['generations']
+        
+        with db_connection() as conn:
+            rows = conn.execute('SELECT name, generation FROM cache_generations').fetchall()
+        generations = {row['name']: row['generation'] for row in rows}
+        
+        with CacheGenerations._lock:
+            changed = [name for name in set(generations) | set(CacheGenerations._seen)
+                       if generations.get(name, 0) != CacheGenerations._seen.get(name, 0)]
+            CacheGenerations._seen = generations
+            callbacks = [callback for name in changed
+                         for callback in CacheGenerations._subscribers.get(name, [])]
+        for callback in callbacks:
+            callback()
+        
+        if session is not None:
+            session.cache['generations'] = generations
+        return generations
+    
+    @staticmethod
+    def get(name):
+        """Get the current generation of a named cache"""
+        return CacheGenerations.sync().get(name, 0)
+    
+    @staticmethod
+    def bump(conn, name):
+        """Advance a named cache's generation inside the caller's transaction"""
+        conn.execute('''
+            INSERT INTO cache_generations (name, generation) VALUES (?, 1)
+            ON CONFLICT (name) DO UPDATE SET generation = generation + 1
+        ''', (name,))
+        session = current_session()
+        if session is not None:
+            session.cache.pop('generations', None)
+
+
+class GenerationCache:
+    """A per-process value tagged with the generations it was loaded at.
+    
+    loader(conn) is only called again once one of the named generations
+    moves. Values loaded inside a write session are not shared, since that
+    session may be looking at its own uncommitted changes.
+    """
+    
+    def __init__(self, names, loader):
+        self.names = (names,) if isinstance(names, str) else tuple(names)
+        self.loader = loader
+        self._entry = None
+        for name in self.names:
+            CacheGenerations.subscribe(name, self.invalidate)
+    
+    def invalidate(self):
+        self._entry = None
+    
+    def get(self):
+        generations = CacheGenerations.sync()
+        generation = tuple(generations.get(name, 0) for name in self.names)
+        entry = self._entry
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+        
+        with db_connection() as conn:
+            value = self.loader(conn)
+        session = current_session()
+        if session is None or not session.write:
+            self._entry = (generation, value)
+        return value
+
+
+def init_db():
+    """Bring the database schema up to date.
     
-    conn.commit()
-    conn.close()
+    Cheap when the schema is already current (the journal mode and a
+    PRAGMA user_version read), so it is safe to call on every worker start.
+    """
+    from migrations import migrate
+    return migrate()
 
 
 class User:
@@ -170,39 +419,36 @@ class User:
     
     @staticmethod
     def get_by_id(user_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+            row = cursor.fetchone()
         return User.from_row(row)
     
     @staticmethod
     def get_by_access_token(token):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE access_token = ?', (token,))
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE access_token = ?', (token,))
+            row = cursor.fetchone()
         return User.from_row(row)
     
     @staticmethod
     def get_all():
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users ORDER BY display_name')
-        rows = cursor.fetchall()
-        conn.close()
+        """Get every user, players first, each group by name"""
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users ORDER BY is_admin, display_name')
+            rows = cursor.fetchall()
         return [User.from_row(row) for row in rows]
     
     @staticmethod
     def get_active_users():
         """Get all non-admin users"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE is_admin = 0 ORDER BY display_name')
-        rows = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE is_admin = 0 ORDER BY display_name')
+            rows = cursor.fetchall()
         return [User.from_row(row) for row in rows]
     
     @staticmethod
@@ -210,44 +456,84 @@ class User:
         """Get all participants (non-admin users)"""
         return User.get_active_users()
     
-    def save(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if self.id is None:
-            cursor.execute('''
-                INSERT INTO users (display_name, access_token, is_admin, admin_password)
-                VALUES (?, ?, ?, ?)
-            ''', (self.display_name, self.access_token, int(self.is_admin), self.admin_password))
-            self.id = cursor.lastrowid
-        else:
-            cursor.execute('''
-                UPDATE users SET display_name = ?, access_token = ?,
-                                 is_admin = ?, admin_password = ?, last_visit = ?
-                WHERE id = ?
-            ''', (self.display_name, self.access_token, int(self.is_admin),
-                  self.admin_password, self.last_visit, self.id))
+    @staticmethod
+    def create_many(display_names):
+        """Add players in bulk, each with a fresh invite token.
         
-        conn.commit()
-        conn.close()
+        Names are trimmed and compared case-insensitively, so repeats within
+        the list and names already in the pool are skipped. All rows go in
+        with one executemany in a single transaction. Returns
+        (players added, names skipped).
+        """
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT display_name FROM users WHERE is_admin = 0')
+            seen = {row['display_name'].strip().casefold() for row in cursor.fetchall()}
+            
+            rows = []
+            skipped = 0
+            for name in display_names:
+                name = name.strip()
+                if not name:
+                    continue
+                if name.casefold() in seen:
+                    skipped += 1
+                    continue
+                seen.add(name.casefold())
+                rows.append((name, secrets.token_urlsafe(16)))
+            
+            if rows:
+                cursor.executemany('INSERT INTO users (display_name, access_token, is_admin) VALUES (?, ?, 0)',
+                                   rows)
+                CacheGenerations.bump(conn, 'users')
+        return len(rows), skipped
+    
+    def save(self):
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.id is None:
+                cursor.execute('''
+                    INSERT INTO users (display_name, access_token, is_admin, admin_password)
+                    VALUES (?, ?, ?, ?)
+                ''', (self.display_name, self.access_token, int(self.is_admin), self.admin_password))
+                self.id = cursor.lastrowid
+            else:
+                cursor.execute('''
+                    UPDATE users SET display_name = ?, access_token = ?,
+                                     is_admin = ?, admin_password = ?, last_visit = ?
+                    WHERE id = ?
+                ''', (self.display_name, self.access_token, int(self.is_admin),
+                      self.admin_password, self.last_visit, self.id))
+            CacheGenerations.bump(conn, 'users')
         return self
     
+    def record_visit(self):
+        """Stamp last_visit (without invalidating any cached user lists)"""
+        self.last_visit = datetime.utcnow().isoformat()
+        with db_connection() as conn:
+            conn.execute('UPDATE users SET last_visit = ? WHERE id = ?',
+                         (self.last_visit, self.id))
+    
     def delete(self):
         if self.id:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM user_answers WHERE user_id = ?', (self.id,))
-            cursor.execute('DELETE FROM user_freeform_answers WHERE user_id = ?', (self.id,))
-            cursor.execute('DELETE FROM users WHERE id = ?', (self.id,))
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM user_answers WHERE user_id = ?', (self.id,))
+                cursor.execute('DELETE FROM user_freeform_answers WHERE user_id = ?', (self.id,))
+                cursor.execute('DELETE FROM scores WHERE user_id = ?', (self.id,))
+                cursor.execute('DELETE FROM pick_vectors WHERE user_id = ?', (self.id,))
+                cursor.execute('DELETE FROM users WHERE id = ?', (self.id,))
+                CacheGenerations.bump(conn, 'users')
+                CacheGenerations.bump(conn, 'answers')
 
 
 class PropQuestion:
     """Prop question model class"""
     
     def __init__(self, id=None, category=None, question=None, option_a=None,
-                 option_b=None, correct_answer=None, display_order=0, is_active=True):
+                 option_b=None, correct_answer=None, display_order=0, is_active=True,
+                 line=None, stat_key=None, prop_key=None):
         self.id = id
         self.category = category
         self.question = question
@@ -256,6 +542,11 @@ class PropQuestion:
         self.correct_answer = correct_answer
         self.display_order = display_order
         self.is_active = is_active
+        # Over/under props: option A is over `line` of the stat `stat_key`
+        self.line = line
+        self.stat_key = stat_key
+        # The prop's id in props_config.json (None for questions added by hand)
+        self.prop_key = prop_key
     
     @staticmethod
     def from_row(row):
@@ -269,36 +560,40 @@ class PropQuestion:
             option_b=row['option_b'],
             correct_answer=row['correct_answer'],
             display_order=row['display_order'],
-            is_active=bool(row['is_active'])
+            is_active=bool(row['is_active']),
+            line=row['line'],
+            stat_key=row['stat_key'],
+            prop_key=row['prop_key']
         )
     
     @staticmethod
     def get_all():
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM prop_questions ORDER BY display_order, id')
-        rows = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM prop_questions ORDER BY display_order, id')
+            rows = cursor.fetchall()
         return [PropQuestion.from_row(row) for row in rows]
     
     @staticmethod
     def get_active():
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM prop_questions WHERE is_active = 1 ORDER BY display_order, id')
-        rows = cursor.fetchall()
-        conn.close()
-        return [PropQuestion.from_row(row) for row in rows]
+        # Rows come from the 'questions' generation cache; fresh objects are
+        # built each call so callers can modify and save them safely
+        return [PropQuestion.from_row(row) for row in _active_questions_cache.get()]
     
     @staticmethod
     def get_by_id(question_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM prop_questions WHERE id = ?', (question_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM prop_questions WHERE id = ?', (question_id,))
+            row = cursor.fetchone()
         return PropQuestion.from_row(row)
     
+    @staticmethod
+    def get_lines(stat_keys):
+        """Get the active over/under props that follow any of the given stats"""
+        return [question for question in PropQuestion.get_active()
+                if question.line is not None and question.stat_key in stat_keys]
+    
     @staticmethod
     def get_by_category():
         """Get questions grouped by category"""
@@ -311,29 +606,133 @@ class PropQuestion:
         return categories
     
     def save(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.id is None:
+                cursor.execute('''
+                    INSERT INTO prop_questions (category, question, option_a, option_b,
+                                                correct_answer, display_order, is_active,
+                                                line, stat_key, prop_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (self.category, self.question, self.option_a, self.option_b,
+                      self.correct_answer, self.display_order, int(self.is_active),
+                      self.line, self.stat_key, self.prop_key))
+                self.id = cursor.lastrowid
+                CacheGenerations.bump(conn, 'questions')
+            else:
+                cursor.execute('SELECT correct_answer, is_active FROM prop_questions WHERE id = ?',
+                               (self.id,))
+                old = cursor.fetchone()
+                cursor.execute('''
+                    UPDATE prop_questions SET category = ?, question = ?, option_a = ?,
+                                              option_b = ?, correct_answer = ?,
+                                              display_order = ?, is_active = ?,
+                                              line = ?, stat_key = ?, prop_key = ?
+                    WHERE id = ?
+                ''', (self.category, self.question, self.option_a, self.option_b,
+                      self.correct_answer, self.display_order, int(self.is_active),
+                      self.line, self.stat_key, self.prop_key, self.id))
+                
+                CacheGenerations.bump(conn, 'questions')
+                
+                # Keep the materialized scores in step with the change
+                if old is not None:
+                    if bool(old['is_active']) != bool(self.is_active):
+                        Score.rebuild(conn)
+                    elif self.is_active and old['correct_answer'] != self.correct_answer:
+                        Score.apply_grade(conn, self.id, old['correct_answer'], self.correct_answer)
+        return self
+    
+    @staticmethod
+    def delete(question_id):
+        """Delete a question along with every pick made on it"""
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM user_answers WHERE question_id = ?', (question_id,))
+            cursor.execute('DELETE FROM prop_questions WHERE id = ?', (question_id,))
+            CacheGenerations.bump(conn, 'questions')
+            CacheGenerations.bump(conn, 'answers')
+            Score.rebuild(conn)
+    
+    @staticmethod
+    def grade(answers, freeform=None, replace=False):
+        """Apply an answer key (or a diff of one) in a single transaction.
         
-        if self.id is None:
-            cursor.execute('''
-                INSERT INTO prop_questions (category, question, option_a, option_b,
-                                            correct_answer, display_order, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (self.category, self.question, self.option_a, self.option_b,
-                  self.correct_answer, self.display_order, int(self.is_active)))
-            self.id = cursor.lastrowid
-        else:
-            cursor.execute('''
-                UPDATE prop_questions SET category = ?, question = ?, option_a = ?,
-                                          option_b = ?, correct_answer = ?,
-                                          display_order = ?, is_active = ?
-                WHERE id = ?
-            ''', (self.category, self.question, self.option_a, self.option_b,
-                  self.correct_answer, self.display_order, int(self.is_active), self.id))
+        answers maps question id -> 'A', 'B' or None (ungraded); freeform
+        maps tiebreaker field_id -> value or None. With replace=True anything
+        not listed is cleared, so {} with replace=True clears the whole key.
+        Only questions whose answer actually changes are written and
+        rescored. Returns (number of changes, new scores generation).
+        """
+        # Only '' and None clear a grade; anything else but 'A'/'B' (0, [],
+        # false) is a mistake, not a request to clear
+        invalid = [value for value in answers.values() if value not in (None, '', 'A', 'B')]
+        if invalid:
+            raise ValueError(f"Invalid answer {invalid[0]!r}; expected 'A', 'B' or empty")
+        answers = {int(qid): (value or None) for qid, value in answers.items()}
+        invalid = [value for value in (freeform or {}).values()
+                   if isinstance(value, (bool, list, dict))]
+        if invalid:
+            raise ValueError(f"Invalid tiebreaker value {invalid[0]!r}")
+        # A tiebreaker of 0 is a real value; only None or '' clears one
+        freeform = {field_id: None if value in (None, '') else str(value)
+                    for field_id, value in (freeform or {}).items()}
         
-        conn.commit()
-        conn.close()
-        return self
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, correct_answer, is_active FROM prop_questions')
+            current = {row['id']: row for row in cursor.fetchall()}
+            
+            question_changes = []
+            for question_id, row in current.items():
+                if question_id in answers:
+                    new_value = answers[question_id]
+                elif replace:
+                    new_value = None
+                else:
+                    continue
+                if new_value != row['correct_answer']:
+                    question_changes.append((question_id, row['correct_answer'], new_value,
+                                             bool(row['is_active'])))
+            
+            cursor.execute('SELECT field_id, correct_value FROM freeform_fields')
+            current_ff = {row['field_id']: row['correct_value'] for row in cursor.fetchall()}
+            ff_changes = []
+            for field_id, old_value in current_ff.items():
+                if field_id in freeform:
+                    new_value = freeform[field_id]
+                elif replace:
+                    new_value = None
+                else:
+                    continue
+                if new_value != old_value:
+                    ff_changes.append((new_value, field_id))
+            
+            if question_changes:
+                cursor.executemany('UPDATE prop_questions SET correct_answer = ? WHERE id = ?',
+                                   [(new, question_id) for question_id, _, new, _ in question_changes])
+                for question_id, old, new, is_active in question_changes:
+                    if is_active:
+                        Score.apply_grade(conn, question_id, old, new)
+                CacheGenerations.bump(conn, 'questions')
+            if ff_changes:
+                cursor.executemany('UPDATE freeform_fields SET correct_value = ? WHERE field_id = ?',
+                                   ff_changes)
+                CacheGenerations.bump(conn, 'questions')
+                Score.rescore_tiebreakers(conn)
+        
+        return len(question_changes) + len(ff_changes), CacheGenerations.get('scores')
+    
+    @staticmethod
+    def reorder(question_ids):
+        """Set display_order from a list of question ids"""
+        with db_connection() as conn:
+            conn.executemany(
+                'UPDATE prop_questions SET display_order = ? WHERE id = ?',
+                [(index, question_id) for index, question_id in enumerate(question_ids)]
+            )
+            CacheGenerations.bump(conn, 'questions')
 
 
 class UserAnswer:
@@ -360,79 +759,100 @@ class UserAnswer:
     
     @staticmethod
     def get_user_answers(user_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM user_answers WHERE user_id = ?', (user_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM user_answers WHERE user_id = ?', (user_id,))
+            rows = cursor.fetchall()
         return {row['question_id']: row['answer'] for row in rows}
     
     @staticmethod
-    def get_all_answers():
-        """Get all user answers as a dict: {user_id: {question_id: answer}}"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM user_answers')
-        rows = cursor.fetchall()
-        conn.close()
-        
-        answers = {}
+    def get_answers_for_users(user_ids):
+        """Get some players' answers as {user_id: {question_id: answer}}"""
+        answers = {user_id: {} for user_id in user_ids}
+        if not answers:
+            return answers
+        placeholders = ','.join('?' * len(answers))
+        with db_connection() as conn:
+            rows = conn.execute(f'SELECT user_id, question_id, answer FROM user_answers '
+                                f'WHERE user_id IN ({placeholders})', list(answers)).fetchall()
         for row in rows:
-            if row['user_id'] not in answers:
-                answers[row['user_id']] = {}
             answers[row['user_id']][row['question_id']] = row['answer']
         return answers
     
+    @staticmethod
+    def get_pick_counts():
+        """Get how many players picked each side as {question_id: {'A': n, 'B': n}}"""
+        return _pick_counts_cache.get()
+    
     @staticmethod
     def save_answer(user_id, question_id, answer):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_answers (user_id, question_id, answer, submitted_at)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, question_id, answer, datetime.utcnow().isoformat()))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO user_answers (user_id, question_id, answer, submitted_at)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, question_id, answer, datetime.utcnow().isoformat()))
+            CacheGenerations.bump(conn, 'answers')
+            Score.rescore_users(conn, [user_id])
     
     @staticmethod
     def save_all_answers(user_id, answers_dict):
         """Save multiple answers at once"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        now = datetime.utcnow().isoformat()
-        
-        for question_id, answer in answers_dict.items():
-            cursor.execute('''
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            now = datetime.utcnow().isoformat()
+            
+            for question_id, answer in answers_dict.items():
+                cursor.execute('''
+                    INSERT OR REPLACE INTO user_answers (user_id, question_id, answer, submitted_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (user_id, int(question_id), answer, now))
+            CacheGenerations.bump(conn, 'answers')
+            Score.rescore_users(conn, [user_id])
+    
+    @staticmethod
+    def save_many(rows):
+        """Save (user_id, question_id, answer, submitted_at) rows in one transaction"""
+        with db_connection() as conn:
+            conn.executemany('''
                 INSERT OR REPLACE INTO user_answers (user_id, question_id, answer, submitted_at)
                 VALUES (?, ?, ?, ?)
-            ''', (user_id, int(question_id), answer, now))
-        
-        conn.commit()
-        conn.close()
+            ''', rows)
+            CacheGenerations.bump(conn, 'answers')
+            Score.rescore_users(conn, [row[0] for row in rows])
 
 
 class Settings:
-    """App settings helper class"""
+    """App settings helper class.
+    
+    The whole settings table is held in the 'settings' generation cache, so
+    reads cost nothing until Settings.set bumps the generation (in this
+    worker or any other).
+    """
+    
+    @staticmethod
+    def _values():
+        return _settings_cache.get()
     
     @staticmethod
     def get(key, default=None):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
-        row = cursor.fetchone()
-        conn.close()
-        return row['value'] if row else default
+        return Settings._values().get(key, default)
+    
+    @staticmethod
+    def get_many(keys_defaults):
+        """Get several settings at once as {key: value}"""
+        values = Settings._values()
+        return {key: values.get(key, default) for key, default in keys_defaults.items()}
     
     @staticmethod
     def set(key, value):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO settings (key, value, updated_at)
-            VALUES (?, ?, ?)
-        ''', (key, value, datetime.utcnow().isoformat()))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES (?, ?, ?)
+            ''', (key, value, datetime.utcnow().isoformat()))
+            CacheGenerations.bump(conn, 'settings')
     
     @staticmethod
     def get_timezone():
@@ -511,14 +931,16 @@ class GameConfig:
     def set(key, value):
         """Set a game config value"""
         Settings.set(f'game_{key}', value)
+        if key in ('team_a_code', 'team_b_code'):
+            with db_connection() as conn:
+                CacheGenerations.bump(conn, 'teams')
     
     @staticmethod
     def get_all():
         """Get all game configuration as a dictionary"""
-        config = {}
-        for key, default in GameConfig.KEYS.items():
-            config[key] = GameConfig.get(key, default)
-        return config
+        values = Settings.get_many({f'game_{key}': default
+                                    for key, default in GameConfig.KEYS.items()})
+        return {key: values[f'game_{key}'] for key in GameConfig.KEYS}
     
     @staticmethod
     def set_all(config_dict):
@@ -530,16 +952,12 @@ class GameConfig:
     @staticmethod
     def get_team_a():
         """Get team A data"""
-        from nfl_teams import get_team
-        code = GameConfig.get('team_a_code', 'KC')
-        return get_team(code)
+        return _teams_cache.get()['team_a_code']
     
     @staticmethod
     def get_team_b():
         """Get team B data"""
-        from nfl_teams import get_team
-        code = GameConfig.get('team_b_code', 'PHI')
-        return get_team(code)
+        return _teams_cache.get()['team_b_code']
     
     @staticmethod
     def get_game_datetime():
@@ -595,36 +1013,41 @@ class FreeformField:
     
     @staticmethod
     def get_all():
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT * FROM freeform_fields ORDER BY display_order')
-            rows = cursor.fetchall()
-        except:
-            rows = []
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT * FROM freeform_fields ORDER BY display_order')
+                rows = cursor.fetchall()
+            except:
+                rows = []
         return [FreeformField.from_row(row) for row in rows]
     
     @staticmethod
     def get_by_field_id(field_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM freeform_fields WHERE field_id = ?', (field_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM freeform_fields WHERE field_id = ?', (field_id,))
+            row = cursor.fetchone()
         return FreeformField.from_row(row)
     
     def save(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO freeform_fields 
-            (field_id, label, field_type, placeholder, correct_value, display_order)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (self.field_id, self.label, self.field_type, self.placeholder,
-              self.correct_value, self.display_order))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT correct_value FROM freeform_fields WHERE field_id = ?',
+                           (self.field_id,))
+            old = cursor.fetchone()
+            cursor.execute('''
+                INSERT OR REPLACE INTO freeform_fields 
+                (field_id, label, field_type, placeholder, correct_value, display_order)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (self.field_id, self.label, self.field_type, self.placeholder,
+                  self.correct_value, self.display_order))
+            
+            CacheGenerations.bump(conn, 'questions')
+            
+            old_value = old['correct_value'] if old else None
+            if old_value != self.correct_value:
+                Score.rescore_tiebreakers(conn)
 
 
 class UserFreeformAnswer:
@@ -633,27 +1056,25 @@ class UserFreeformAnswer:
     @staticmethod
     def get_user_answers(user_id):
         """Get all freeform answers for a user as {field_id: value}"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT field_id, value FROM user_freeform_answers WHERE user_id = ?', (user_id,))
-            rows = cursor.fetchall()
-        except:
-            rows = []
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT field_id, value FROM user_freeform_answers WHERE user_id = ?', (user_id,))
+                rows = cursor.fetchall()
+            except:
+                rows = []
         return {row['field_id']: row['value'] for row in rows}
     
     @staticmethod
     def get_all_answers():
         """Get all freeform answers as {user_id: {field_id: value}}"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT * FROM user_freeform_answers')
-            rows = cursor.fetchall()
-        except:
-            rows = []
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT * FROM user_freeform_answers')
+                rows = cursor.fetchall()
+            except:
+                rows = []
         
         answers = {}
         for row in rows:
@@ -664,28 +1085,316 @@ class UserFreeformAnswer:
     
     @staticmethod
     def save_answer(user_id, field_id, value):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_freeform_answers (user_id, field_id, value, submitted_at)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, field_id, value, datetime.utcnow().isoformat()))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO user_freeform_answers (user_id, field_id, value, submitted_at)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, field_id, value, datetime.utcnow().isoformat()))
+            CacheGenerations.bump(conn, 'answers')
+            Score.rescore_users(conn, [user_id])
     
     @staticmethod
     def save_all_answers(user_id, answers_dict):
         """Save multiple freeform answers at once"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            now = datetime.utcnow().isoformat()
+            
+            for field_id, value in answers_dict.items():
+                if value:  # Only save non-empty values
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO user_freeform_answers (user_id, field_id, value, submitted_at)
+                        VALUES (?, ?, ?, ?)
+                    ''', (user_id, field_id, str(value), now))
+            CacheGenerations.bump(conn, 'answers')
+            Score.rescore_users(conn, [user_id])
+
+
+class PickVectors:
+    """Bit-packed snapshot of every player's picks.
+    
+    Bit n of a vector stands for the question with id n. A player's
+    `answered` mask has the bit set for every question they picked and
+    `picks` has it set where the pick is 'B'; the answer key is packed the
+    same way with `graded` marking questions that have a correct answer.
+    The number of correct picks is then the popcount of the XNOR of picks
+    and key, masked by the answered and graded bits. Vectors are stored in
+    the pick_vectors table and refreshed in the same transaction as the
+    user_answers rows they mirror.
+    """
+    
+    @staticmethod
+    def pack(answers):
+        """Pack {question_id: 'A' | 'B'} into (picks, mask) integers"""
+        picks = mask = 0
+        for question_id, answer in answers.items():
+            if answer in ('A', 'B'):
+                mask |= 1 << question_id
+                if answer == 'B':
+                    picks |= 1 << question_id
+        return picks, mask
+    
+    @staticmethod
+    def to_blob(bits):
+        return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    
+    @staticmethod
+    def from_blob(blob):
+        return int.from_bytes(blob, 'little')
+    
+    @staticmethod
+    def refresh(conn, user_ids=None):
+        """Re-pack the given players' vectors (everyone's if None) from user_answers"""
+        query = 'SELECT id FROM users'
+        answers_query = 'SELECT user_id, question_id, answer FROM user_answers'
+        params = []
+        if user_ids is not None:
+            placeholders = ','.join('?' * len(user_ids))
+            query += f' WHERE id IN ({placeholders})'
+            answers_query += f' WHERE user_id IN ({placeholders})'
+            params = list(user_ids)
+        
+        answers = {row['id']: {} for row in conn.execute(query, params)}
+        for row in conn.execute(answers_query, params):
+            if row['user_id'] in answers:
+                answers[row['user_id']][row['question_id']] = row['answer']
+        
+        vectors = {user_id: PickVectors.pack(picks) for user_id, picks in answers.items()}
+        conn.executemany('INSERT OR REPLACE INTO pick_vectors (user_id, picks, answered) VALUES (?, ?, ?)',
+                         [(user_id, PickVectors.to_blob(picks), PickVectors.to_blob(mask))
+                          for user_id, (picks, mask) in vectors.items()])
+        return vectors
+    
+    @staticmethod
+    def load(conn):
+        """Get {user_id: (picks, answered)} for every player"""
+        return {row['user_id']: (PickVectors.from_blob(row['picks']),
+                                 PickVectors.from_blob(row['answered']))
+                for row in conn.execute('SELECT user_id, picks, answered FROM pick_vectors')}
+    
+    @staticmethod
+    def load_key(conn):
+        """Get the answer key as (key, graded, active) integers"""
+        rows = conn.execute('SELECT id, correct_answer FROM prop_questions WHERE is_active = 1').fetchall()
+        key, graded = PickVectors.pack({row['id']: row['correct_answer'] for row in rows})
+        active = 0
+        for row in rows:
+            active |= 1 << row['id']
+        return key, graded, active
+    
+    @staticmethod
+    def score(vector, key):
+        """Get (correct, answered, max_possible) for one player's vector against a packed key"""
+        picks, mask = vector
+        key_bits, graded, active = key
+        correct = (~(picks ^ key_bits) & mask & graded).bit_count()
+        return correct, (mask & active).bit_count(), correct + (mask & active & ~graded).bit_count()
+
+
+class Score:
+    """Materialized per-player scores.
+    
+    Rows are kept current by the model writes above, in the same
+    transaction: a pick change rescores only that player, grading a
+    question shifts only the players who picked it, and grading a
+    tiebreaker refreshes the tiebreaker column. max_possible is the score
+    a player reaches if every open prop they picked goes their way.
+    """
+    
+    # Only values that look like numbers take part (SQLite's CAST would
+    # quietly turn anything else into 0)
+    _NUMERIC = "trim({0}) GLOB '*[0-9]*' AND trim({0}) NOT GLOB '*[^0-9.eE+-]*'"
+    
+    @staticmethod
+    def tiebreaker_graded(conn):
+        """Whether any tiebreaker has a usable correct value (so ties are broken by distance)"""
+        return conn.execute(f'''
+            SELECT 1 FROM freeform_fields
+            WHERE correct_value IS NOT NULL AND {Score._NUMERIC.format('correct_value')}
+            LIMIT 1
+        ''').fetchone() is not None
+    
+    @staticmethod
+    def _tiebreaker_diffs(conn, user_ids=None):
+        """Get {user_id: distance} from the last graded tiebreaker each player answered"""
+        numeric = Score._NUMERIC
+        query = f'''
+            WITH graded AS (
+                SELECT field_id, id, display_order, CAST(trim(correct_value) AS REAL) AS correct
+                FROM freeform_fields
+                WHERE correct_value IS NOT NULL AND {numeric.format('correct_value')}
+            ), distances AS (
+                SELECT a.user_id, ABS(CAST(trim(a.value) AS REAL) - g.correct) AS diff,
+                       ROW_NUMBER() OVER (PARTITION BY a.user_id
+                                          ORDER BY g.display_order DESC, g.id DESC) AS pick
+                FROM user_freeform_answers a
+                JOIN graded g ON g.field_id = a.field_id
+                WHERE {numeric.format('a.value')}
+        '''
+        params = []
+        if user_ids is not None:
+            query += f" AND a.user_id IN ({','.join('?' * len(user_ids))})"
+            params = list(user_ids)
+        query += ') SELECT user_id, diff FROM distances WHERE pick = 1'
+        return {row['user_id']: row['diff'] for row in conn.execute(query, params)}
+    
+    @staticmethod
+    def _score_users(conn, user_ids=None):
+        vectors = PickVectors.refresh(conn, user_ids)
+        key = PickVectors.load_key(conn)
+        diffs = Score._tiebreaker_diffs(conn, user_ids)
+        now = datetime.utcnow().isoformat()
+        conn.executemany('''
+            INSERT OR REPLACE INTO scores
+                (user_id, correct, answered, max_possible, tiebreaker_diff, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(user_id, *PickVectors.score(vector, key), diffs.get(user_id), now)
+              for user_id, vector in vectors.items()])
+        CacheGenerations.bump(conn, 'scores')
+    
+    @staticmethod
+    def rescore_users(conn, user_ids):
+        """Recompute the rows of the given players"""
+        user_ids = sorted(set(user_ids))
+        if user_ids:
+            Score._score_users(conn, user_ids)
+    
+    @staticmethod
+    def apply_grade(conn, question_id, old_answer, new_answer):
+        """Shift scores after an active question's correct answer changes"""
         now = datetime.utcnow().isoformat()
+        for answer, delta in ((old_answer, -1), (new_answer, 1)):
+            if answer:
+                conn.execute('''
+                    UPDATE scores SET correct = correct + ?, max_possible = max_possible + ?,
+                                      updated_at = ?
+                    WHERE user_id IN (SELECT user_id FROM user_answers
+                                      WHERE question_id = ? AND answer = ?)
+                ''', (delta, delta, now, question_id, answer))
         
-        for field_id, value in answers_dict.items():
-            if value:  # Only save non-empty values
-                cursor.execute('''
-                    INSERT OR REPLACE INTO user_freeform_answers (user_id, field_id, value, submitted_at)
-                    VALUES (?, ?, ?, ?)
-                ''', (user_id, field_id, str(value), now))
+        # Closing a prop takes it out of every picker's reachable score
+        # (the winners got it back as a correct pick above); reopening it
+        # puts it back
+        if bool(old_answer) != bool(new_answer):
+            conn.execute('''
+                UPDATE scores SET max_possible = max_possible + ?
+                WHERE user_id IN (SELECT user_id FROM user_answers WHERE question_id = ?)
+            ''', (-1 if new_answer else 1, question_id))
+        CacheGenerations.bump(conn, 'scores')
+    
+    @staticmethod
+    def rescore_tiebreakers(conn):
+        """Recompute every player's tiebreaker distance"""
+        diffs = Score._tiebreaker_diffs(conn)
+        conn.execute('UPDATE scores SET tiebreaker_diff = NULL')
+        conn.executemany('UPDATE scores SET tiebreaker_diff = ? WHERE user_id = ?',
+                         [(diff, user_id) for user_id, diff in diffs.items()])
+        CacheGenerations.bump(conn, 'scores')
+    
+    @staticmethod
+    def rebuild(conn=None):
+        """Recompute the whole table (after structural changes or migrations)"""
+        if conn is None:
+            with db_connection() as conn:
+                return Score.rebuild(conn)
+        conn.execute('DELETE FROM scores')
+        conn.execute('DELETE FROM pick_vectors')
+        Score._score_users(conn)
+    
+    @staticmethod
+    def get_leaderboard():
+        """Get participants ranked by score as a list of (User, score dict).
         
-        conn.commit()
-        conn.close()
\ No newline at end of file
+        Besides the score, each entry says whether the player has clinched
+        (nobody else can reach their score), has been eliminated (they can
+        no longer reach the leader's), and their magic number: how many more
+        of their own points or misses by their closest rival it takes to
+        clinch. Ties on points are treated as still open, whatever the
+        tiebreaker may later say.
+        """
+        rows = _leaderboard_cache.get()
+        
+        # The best rival of the top player is the runner-up; everyone
+        # else's best rival is the top player
+        def top_two(column):
+            ordered = sorted((row[column] for row in rows), reverse=True)
+            return (ordered + [None, None])[:2]
+        
+        top_max, second_max = top_two('max_possible')
+        top_correct, second_correct = top_two('correct')
+        
+        leaderboard = []
+        for row in rows:
+            rival_max = second_max if row['max_possible'] == top_max else top_max
+            rival_correct = second_correct if row['correct'] == top_correct else top_correct
+            if rival_max is None or row['correct'] > rival_max:
+                status, magic_number = 'clinched', 0
+            elif row['max_possible'] < rival_correct:
+                status, magic_number = 'eliminated', None
+            else:
+                status, magic_number = 'alive', rival_max - row['correct'] + 1
+            
+            leaderboard.append((User.from_row(row), {
+                'rank': row['rank'],
+                'correct': row['correct'],
+                'answered': row['answered'],
+                'max_possible': row['max_possible'],
+                'status': status,
+                'magic_number': magic_number,
+                'tiebreaker_diff': row['tiebreaker_diff']
+            }))
+        return leaderboard
+
+
+def _load_settings(conn):
+    rows = conn.execute('SELECT key, value FROM settings').fetchall()
+    return {row['key']: row['value'] for row in rows}
+
+
+def _load_active_questions(conn):
+    return conn.execute(
+        'SELECT * FROM prop_questions WHERE is_active = 1 ORDER BY display_order, id'
+    ).fetchall()
+
+
+def _load_teams(conn):
+    from nfl_teams import get_team
+    values = _load_settings(conn)
+    codes = {key: values.get(f'game_{key}', GameConfig.KEYS[key])
+             for key in ('team_a_code', 'team_b_code')}
+    return {key: get_team(code) for key, code in codes.items()}
+
+
+def _load_leaderboard(conn):
+    # Players level on points and tiebreaker share a rank
+    return conn.execute('''
+        SELECT u.*, COALESCE(s.correct, 0) AS correct,
+               COALESCE(s.answered, 0) AS answered,
+               COALESCE(s.max_possible, 0) AS max_possible, s.tiebreaker_diff,
+               RANK() OVER (ORDER BY COALESCE(s.correct, 0) DESC,
+                                     COALESCE(s.tiebreaker_diff, 9999)) AS rank
+        FROM users u
+        LEFT JOIN scores s ON s.user_id = u.id
+        WHERE u.is_admin = 0
+        ORDER BY rank, u.display_name
+    ''').fetchall()
+
+
+def _load_pick_counts(conn):
+    # One pass over idx_user_answers_question; the result is one small
+    # dict per question however many players there are
+    counts = {}
+    for row in conn.execute('''
+        SELECT question_id, answer, COUNT(*) AS picks FROM user_answers
+        GROUP BY question_id, answer
+    '''):
+        counts.setdefault(row['question_id'], {'A': 0, 'B': 0})[row['answer']] = row['picks']
+    return counts
+
+
+_settings_cache = GenerationCache('settings', _load_settings)
+_active_questions_cache = GenerationCache('questions', _load_active_questions)
+_teams_cache = GenerationCache('teams', _load_teams)
+_leaderboard_cache = GenerationCache(('scores', 'users'), _load_leaderboard)
+_pick_counts_cache = GenerationCache('answers', _load_pick_counts)
@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for Super Bowl Props
+Loaded automatically by `gunicorn app:app` when run from the project directory
+
+Uses threaded workers (gthread) instead of the default sync workers. A sync
+worker handles one connection at a time, so a slow phone or a live-update
+stream ties up the whole worker. With gthread each worker serves up to
+GUNICORN_THREADS requests at once, idle keep-alive connections cost no
+thread at all, and SQLite releases the GIL while it works, so the pooled
+connections in database.py are used from many threads in parallel.
+
+The app is preloaded: the master imports app.py (which has no side
+effects) and runs the one-shot bootstrap before forking, so workers start
+without repeating migrations or admin checks and share the imported
+modules, NFL_TEAMS and the compiled templates copy-on-write.
+"""
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# A thread parked on a live stream costs a little memory and no CPU; 128
+# leaves 28 for ordinary requests next to LIVE_MAX_STREAMS=100 streams
+threads = int(os.environ.get('GUNICORN_THREADS', 128))
+
+# Keep idle browser connections open between requests (cheap under gthread)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+
+# Import the app once in the master and fork workers from it
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+
+def on_starting(server):
+    """Bootstrap once in the master before any worker starts"""
+    from app import app, bootstrap
+    from database import get_pool
+    
+    bootstrap()
+    # Workers must not inherit open SQLite handles
+    get_pool().close_all()
+    
+    if preload_app:
+        # Compile every template now so workers inherit them instead of
+        # each compiling its own copy on first render
+        for name in app.jinja_env.list_templates(extensions=['html']):
+            app.jinja_env.get_template(name)
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers don't write to (and so copy) the shared pages
+    gc.freeze()
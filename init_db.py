@@ -4,15 +4,13 @@ Initialize the database with tables and default data
 """
 import os
 import sys
-import json
 import sqlite3
 
 # Add the project directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database import init_db, User, PropQuestion, get_db_connection
-
-PROPS_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'props_config.json')
+from database import init_db, User, Score, CacheGenerations, get_db_connection
+from props_loader import PROPS_CONFIG_FILE, load_config, import_config
 
 def create_default_admin():
     """Create default admin user if it doesn't exist"""
@@ -48,78 +46,36 @@ def create_default_questions():
     conn.close()
     
     if count > 0:
-        print(f"• {count} questions already exist (use --reset to reload from config)")
+        print(f"• {count} questions already exist (use --reload to apply config changes)")
         return
     
     # Load props from JSON config file
-    if not os.path.exists(PROPS_CONFIG_FILE):
+    config = load_config()
+    if config is None:
         print(f"⚠ Props config file not found: {PROPS_CONFIG_FILE}")
         print("  Create props_config.json or add questions manually in the admin panel.")
         return
     
-    with open(PROPS_CONFIG_FILE, 'r') as f:
-        config = json.load(f)
-    
     event = config.get('event', {})
-    props = config.get('props', [])
-    
     if event:
         print(f"  Event: {event.get('name', 'Unknown')} - {event.get('matchup', '')}")
     
-    for i, prop in enumerate(props):
-        category = prop.get('category', 'Props')
-        label = prop.get('label', f"Question {i+1}")
-        options = prop.get('options', [])
-        
-        # Handle options - can be list of strings or list of objects with over/under
-        if len(options) >= 2:
-            if isinstance(options[0], dict):
-                # Over/under format: {"side": "over", "value": 45.5}
-                opt = options[0]
-                if 'side' in opt and 'value' in opt:
-                    option_a = f"Over {opt['value']}"
-                    option_b = f"Under {options[1]['value']}"
-                else:
-                    option_a = opt.get('display', 'Option A')
-                    option_b = options[1].get('display', 'Option B')
-            else:
-                # Simple string format: ["Heads", "Tails"]
-                option_a = str(options[0])
-                option_b = str(options[1])
-        else:
-            option_a = "Yes"
-            option_b = "No"
-        
-        q = PropQuestion(
-            category=category,
-            question=label,
-            option_a=option_a,
-            option_b=option_b,
-            display_order=i
-        )
-        q.save()
-    
-    print(f"✓ Loaded {len(props)} prop questions from config")
+    summary = import_config(config)
+    print(f"✓ Loaded {summary['inserted']} prop questions from config")
+    if config.get('freeform_fields'):
+        print(f"✓ Loaded {len(config['freeform_fields'])} freeform fields (tiebreakers)")
+
+
+def reload_questions():
+    """Apply props_config.json changes to the existing questions"""
+    config = load_config()
+    if config is None:
+        print(f"⚠ Props config file not found: {PROPS_CONFIG_FILE}")
+        return
     
-    # Load freeform fields (tiebreakers)
-    freeform_fields = config.get('freeform_fields', [])
-    if freeform_fields:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        for i, field in enumerate(freeform_fields):
-            cursor.execute('''
-                INSERT OR REPLACE INTO freeform_fields (field_id, label, field_type, placeholder, display_order)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                field.get('id', f'field_{i}'),
-                field.get('label', f'Field {i+1}'),
-                field.get('type', 'number'),
-                field.get('placeholder', ''),
-                i
-            ))
-        conn.commit()
-        conn.close()
-        print(f"✓ Loaded {len(freeform_fields)} freeform fields (tiebreakers)")
+    summary = import_config(config)
+    print(f"✓ Reloaded props: {summary['inserted']} added, {summary['updated']} updated, "
+          f"{summary['deactivated']} deactivated (picks kept)")
 
 
 def reset_questions():
@@ -134,6 +90,8 @@ def reset_questions():
         cursor.execute('DELETE FROM freeform_fields')
     except sqlite3.OperationalError:
         pass  # Tables might not exist yet
+    CacheGenerations.bump(conn, 'questions')
+    Score.rebuild(conn)
     conn.commit()
     conn.close()
     print("✓ Cleared all existing questions and answers")
@@ -142,6 +100,8 @@ def reset_questions():
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Initialize Super Bowl Props database')
+    parser.add_argument('--reload', action='store_true',
+                        help='Apply changes in props_config.json, keeping picks and grading')
     parser.add_argument('--reset', action='store_true', 
                         help='Reset and reload prop questions from props_config.json')
     parser.add_argument('--reset-all', action='store_true',
@@ -180,7 +140,10 @@ def main():
     
     # Create default questions
     print("Setting up prop questions...")
-    create_default_questions()
+    if args.reload:
+        reload_questions()
+    else:
+        create_default_questions()
     print()
     
     print("="*50)
@@ -189,7 +152,7 @@ def main():
     print("\n🔐 Admin Panel: /admin/login")
     print("   Default Password: superbowl2025")
     print("\n⚠️  IMPORTANT: Change the admin password after first login!")
-    print("\n📋 To reload props from config: python init_db.py --reset\n")
+    print("\n📋 To reload props from config: python init_db.py --reload\n")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,184 @@
+"""
+Live leaderboard and lock-state updates over Server-Sent Events
+Each worker runs one hub thread that notices a change once, formats the
+event once and fans the same bytes out to every connected client
+"""
+import json
+import queue
+import threading
+import time
+
+from background import ProcessThread
+from config import Config
+from database import CacheGenerations, Score, Settings
+from win_probability import win_probabilities
+
+
+def format_event(event, data):
+    """Format one SSE message"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class LiveClient:
+    """One open stream: a bounded queue of formatted events.
+    
+    scores is False for a stream that may only see lock changes (a player
+    before the deadline, or a page that has no leaderboard).
+    """
+    
+    def __init__(self, scores=True):
+        self.scores = scores
+        self.queue = queue.Queue(maxsize=Config.LIVE_CLIENT_BUFFER)
+        self.closed = False
+    
+    def send(self, message):
+        """Queue a message; a client whose queue is full is closed instead"""
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.closed = True
+
+
+class LiveHub(ProcessThread):
+    """Per-process fan-out hub for SSE clients"""
+    
+    def __init__(self, poll_interval=None):
+        super().__init__('live-hub')
+        self.poll_interval = Config.LIVE_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._clients = set()
+        self._lock_state = None
+        self._scores_generation = None
+        self._standings = {}
+    
+    # ------------------------------------------------------------------
+    # Client side
+    # ------------------------------------------------------------------
+    
+    def subscribe(self, scores=True):
+        """Register a client; it stays counted until its stream ends"""
+        self.ensure_started()
+        client = LiveClient(scores)
+        with self._lock:
+            self._clients.add(client)
+        return client
+    
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+    
+    @property
+    def client_count(self):
+        return len(self._clients)
+    
+    def stream(self, client, hello):
+        """Yield a client's SSE messages until it is closed or its time is up.
+        
+        The stream opens with a hello event carrying the current state, so a
+        page that missed events while (re)connecting can tell it is stale.
+        """
+        try:
+            # Tell the browser how soon to reconnect when the stream ends
+            yield 'retry: 3000\n\n'
+            yield format_event('hello', hello)
+            deadline = time.monotonic() + Config.LIVE_STREAM_MAX_SECONDS
+            while not client.closed and time.monotonic() < deadline:
+                try:
+                    message = client.queue.get(timeout=Config.LIVE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    message = ': keep-alive\n\n'
+                # A client that fell behind has missed events: end the stream
+                # now so the browser reconnects instead of idling to the deadline
+                if client.closed:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(client)
+    
+    def publish(self, event, data, scores=False):
+        """Send one event to every client (formatted once).
+        
+        Events with scores=True skip clients that may not see scores.
+        """
+        message = format_event(event, data)
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            if not client.closed and (client.scores or not scores):
+                client.send(message)
+    
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+    
+    def _check_lock(self):
+        lock_time = Settings.get_lock_time()
+        state = (Settings.is_locked(), lock_time.isoformat() if lock_time else None)
+        if self._lock_state is not None and state != self._lock_state:
+            self.publish('lock', {'is_locked': state[0], 'lock_time': state[1]})
+        self._lock_state = state
+        return lock_time
+    
+    def _check_leaderboard(self):
+        generation = CacheGenerations.get('scores')
+        if generation == self._scores_generation:
+            return
+        
+        standings = {}
+        chances = win_probabilities()
+        for user, score in Score.get_leaderboard():
+            standings[user.id] = {
+                'user_id': user.id,
+                'display_name': user.display_name,
+                'rank': score['rank'],
+                'correct': score['correct'],
+                'answered': score['answered'],
+                'max_possible': score['max_possible'],
+                'status': score['status'],
+                'magic_number': score['magic_number'],
+                'tiebreaker_diff': score['tiebreaker_diff'],
+                'win_chance': round(chances.get(user.id, 0.0), 4) if chances else None,
+            }
+        
+        if self._scores_generation is not None:
+            changed = [entry for user_id, entry in standings.items()
+                       if self._standings.get(user_id) != entry]
+            removed = [user_id for user_id in self._standings if user_id not in standings]
+            if changed or removed:
+                self.publish('leaderboard', {
+                    'version': generation,
+                    'changed': changed,
+                    'removed': removed,
+                }, scores=True)
+        self._scores_generation = generation
+        self._standings = standings
+    
+    def _run(self):
+        wake = threading.Event()
+        while True:
+            timeout = self.poll_interval
+            try:
+                # Nobody listening: nothing to compute
+                if self._clients:
+                    lock_time = self._check_lock()
+                    with self._lock:
+                        wants_scores = any(client.scores for client in self._clients)
+                    if wants_scores:
+                        self._check_leaderboard()
+                    else:
+                        # Start from a fresh baseline once someone wants scores
+                        self._scores_generation = None
+                    # Wake right at the deadline so the lock event is on time
+                    if lock_time is not None:
+                        until_lock = (lock_time - Settings.now()).total_seconds()
+                        if 0 <= until_lock < timeout:
+                            timeout = until_lock
+            except Exception as e:
+                print(f"⚠ Live update check failed: {e}")
+            wake.wait(timeout)
+    
+    def _on_start(self):
+        # Streams open in the parent belong to the parent
+        self._clients = set()
+
+
+live_hub = LiveHub()
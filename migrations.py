@@ -0,0 +1,261 @@
+"""
+Schema migrations for Super Bowl Props Web App
+The schema version lives in SQLite's PRAGMA user_version
+"""
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No cross-process locking on Windows dev machines
+
+from config import Config
+from database import get_db_connection, configure_journal_mode, Score
+
+
+def _create_tables(cursor):
+    """v1: the original schema (IF NOT EXISTS so pre-migration databases adopt it)"""
+    # Users table - simplified with access token auth
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            display_name TEXT NOT NULL,
+            access_token TEXT UNIQUE NOT NULL,
+            is_admin INTEGER DEFAULT 0,
+            admin_password TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_visit TEXT
+        )
+    ''')
+    
+    # Settings table for app-wide settings
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Prop questions table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS prop_questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            question TEXT NOT NULL,
+            option_a TEXT NOT NULL,
+            option_b TEXT NOT NULL,
+            correct_answer TEXT,
+            display_order INTEGER DEFAULT 0,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+    
+    # User answers table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer TEXT NOT NULL,
+            submitted_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (question_id) REFERENCES prop_questions (id),
+            UNIQUE (user_id, question_id)
+        )
+    ''')
+    
+    # Freeform fields table (for tiebreakers, etc.)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS freeform_fields (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            field_id TEXT UNIQUE NOT NULL,
+            label TEXT NOT NULL,
+            field_type TEXT DEFAULT 'number',
+            placeholder TEXT,
+            correct_value TEXT,
+            display_order INTEGER DEFAULT 0
+        )
+    ''')
+    
+    # User freeform answers table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_freeform_answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            field_id TEXT NOT NULL,
+            value TEXT NOT NULL,
+            submitted_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            UNIQUE (user_id, field_id)
+        )
+    ''')
+
+
+def _create_indexes(cursor):
+    """v2: secondary indexes for the hot queries"""
+    # The UNIQUE constraints already cover lookups by user
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_admin_name
+        ON users (is_admin, display_name)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_prop_questions_active_order
+        ON prop_questions (is_active, display_order, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_prop_questions_order
+        ON prop_questions (display_order, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_answers_question
+        ON user_answers (question_id, answer, user_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_freeform_fields_order
+        ON freeform_fields (display_order)
+    ''')
+
+
+def _create_scores(cursor):
+    """v3: materialized leaderboard scores"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scores (
+            user_id INTEGER PRIMARY KEY,
+            correct INTEGER NOT NULL DEFAULT 0,
+            answered INTEGER NOT NULL DEFAULT 0,
+            tiebreaker_diff REAL,
+            updated_at TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+
+def _create_cache_generations(cursor):
+    """v4: per-cache generation counters for cross-worker invalidation"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_generations (
+            name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+
+def _create_pick_vectors(cursor):
+    """v5: bit-packed pick snapshot kept alongside user_answers"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pick_vectors (
+            user_id INTEGER PRIMARY KEY,
+            picks BLOB NOT NULL,
+            answered BLOB NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+
+def _add_max_possible(cursor):
+    """v6: best score each player can still reach"""
+    cursor.execute('ALTER TABLE scores ADD COLUMN max_possible INTEGER NOT NULL DEFAULT 0')
+
+
+def _add_prop_lines(cursor):
+    """v7: keep the numeric line and stat key of over/under props"""
+    cursor.execute('ALTER TABLE prop_questions ADD COLUMN line REAL')
+    cursor.execute('ALTER TABLE prop_questions ADD COLUMN stat_key TEXT')
+
+
+def _add_prop_keys(cursor):
+    """v8: stable props_config.json id on each question, for diff-based reloads"""
+    cursor.execute('ALTER TABLE prop_questions ADD COLUMN prop_key TEXT')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_prop_questions_key
+        ON prop_questions (prop_key)
+    ''')
+
+
+def _index_freeform_answers_field(cursor):
+    """v9: tiebreaker guesses by field, for the win-probability model"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_freeform_answers_field
+        ON user_freeform_answers (field_id)
+    ''')
+
+
+# Ordered migration steps: MIGRATIONS[n - 1] upgrades the schema to version n.
+# Released steps must never be edited or reordered - append a new one instead.
+MIGRATIONS = [
+    _create_tables,
+    _create_indexes,
+    _create_scores,
+    _create_cache_generations,
+    _create_pick_vectors,
+    _add_max_possible,
+    _add_prop_lines,
+    _add_prop_keys,
+    _index_freeform_answers_field,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    """Get the schema version recorded in the database"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+@contextmanager
+def database_lock(name):
+    """Hold an exclusive lock shared by every process using the database"""
+    if fcntl is None:
+        yield
+        return
+    
+    with open(f'{Config.DATABASE_PATH}.{name}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migration_lock():
+    """Serialize schema migrations across processes"""
+    return database_lock('migrate')
+
+
+def migrate():
+    """Apply any pending migrations; returns the number of steps applied.
+    
+    The version check is done first without the lock so already-migrated
+    workers only pay for two cheap PRAGMAs. Each step runs in its own
+    transaction together with the user_version bump. Derived tables are
+    rebuilt afterwards so they match the new schema.
+    """
+    conn = get_db_connection()
+    try:
+        # Applied on every start, not just with a migration, so changing
+        # SQLITE_JOURNAL_MODE takes effect on an up-to-date database too
+        configure_journal_mode(conn)
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return 0
+        
+        with migration_lock():
+            # Another process may have migrated while we waited for the lock
+            current = get_schema_version(conn)
+            if current >= SCHEMA_VERSION:
+                return 0
+            
+            for version in range(current + 1, SCHEMA_VERSION + 1):
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    MIGRATIONS[version - 1](conn.cursor())
+                    conn.execute(f'PRAGMA user_version = {version}')
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            
+            Score.rebuild(conn)
+            conn.commit()
+            return SCHEMA_VERSION - current
+    finally:
+        conn.close()
@@ -0,0 +1,252 @@
+"""
+Parsing and importing of props_config.json
+Shared by the app's startup loader and init_db.py so both read the config
+the same way
+"""
+import json
+import os
+
+from database import CacheGenerations, Score, db_connection
+
+PROPS_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'props_config.json')
+
+
+def load_config(path=None):
+    """Read the props config; returns None if the file doesn't exist"""
+    path = path or PROPS_CONFIG_FILE
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def parse_prop(prop, index):
+    """Turn one config prop into prop_questions column values.
+    
+    Options can be plain strings (["Heads", "Tails"]), display objects
+    ({"side": "A", "display": "Heads"}) or an over/under line
+    ({"side": "over", "value": 45.5}). For lines the number is kept in
+    `line` with Over as option A, and `stat_key` names the stat a feed
+    reports for it ("stat" in the config, else the prop id). `prop_key` is
+    the prop's stable id (its label if the config gives none; see
+    parse_props for repeated labels).
+    """
+    options = prop.get('options', [])
+    line = None
+    stat_key = None
+    
+    if len(options) >= 2:
+        if isinstance(options[0], dict):
+            # Over/under format: {"side": "over", "value": 45.5}
+            if 'side' in options[0] and 'value' in options[0]:
+                over = next((opt for opt in options if str(opt.get('side')).lower() == 'over'), options[0])
+                under = next((opt for opt in options if str(opt.get('side')).lower() == 'under'), options[1])
+                option_a = f"Over {over['value']}"
+                option_b = f"Under {under['value']}"
+                line = float(over['value'])
+                stat_key = prop.get('stat', prop.get('id'))
+            else:
+                option_a = options[0].get('display', 'Option A')
+                option_b = options[1].get('display', 'Option B')
+        else:
+            # Simple string format: ["Heads", "Tails"]
+            option_a = str(options[0])
+            option_b = str(options[1])
+    else:
+        option_a = "Yes"
+        option_b = "No"
+    
+    question = prop.get('label', f"Question {index + 1}")
+    return {
+        'prop_key': str(prop.get('id') or question),
+        'category': prop.get('category', 'Props'),
+        'question': question,
+        'option_a': option_a,
+        'option_b': option_b,
+        'display_order': index,
+        'line': line,
+        'stat_key': stat_key,
+    }
+
+
+def parse_props(config):
+    """Parse every prop in a config, each with a prop_key of its own.
+    
+    Props without an id are keyed by their label, so two of them with the
+    same label (or a label equal to another prop's id) would collide; the
+    second and later ones get "#2", "#3", ... in file order.
+    """
+    raw_props = config.get('props', [])
+    props = [parse_prop(prop, i) for i, prop in enumerate(raw_props)]
+    taken = {prop['prop_key'] for raw, prop in zip(raw_props, props) if raw.get('id')}
+    for raw, prop in zip(raw_props, props):
+        if raw.get('id'):
+            continue
+        key, count = prop['prop_key'], 1
+        while key in taken:
+            count += 1
+            key = f"{prop['prop_key']}#{count}"
+        prop['prop_key'] = key
+        taken.add(key)
+    return props
+
+
+def parse_freeform_field(field, index):
+    """Turn one config tiebreaker into freeform_fields column values"""
+    return {
+        'field_id': field.get('id', f'field_{index}'),
+        'label': field.get('label', f'Field {index + 1}'),
+        'field_type': field.get('type', 'number'),
+        'placeholder': field.get('placeholder', ''),
+        'display_order': index,
+    }
+
+
+# Columns the config owns; correct answers and picks are never touched
+PROP_COLUMNS = ('category', 'question', 'option_a', 'option_b', 'display_order', 'line', 'stat_key')
+
+
+def validate_config(config):
+    """Check a parsed config against the expected shape; returns a list of problems"""
+    if not isinstance(config, dict):
+        return ['top level must be an object']
+    props = config.get('props', [])
+    if not isinstance(props, list):
+        return ['"props" must be a list']
+    
+    errors = []
+    ids = set()
+    for i, prop in enumerate(props):
+        where = f'props[{i}]'
+        if not isinstance(prop, dict):
+            errors.append(f'{where} must be an object')
+            continue
+        if not isinstance(prop.get('label'), str) or not prop['label'].strip():
+            errors.append(f'{where} needs a "label"')
+        prop_id = prop.get('id')
+        if prop_id is not None:
+            if not isinstance(prop_id, str) or not prop_id:
+                errors.append(f'{where} "id" must be a non-empty string')
+            elif prop_id in ids:
+                errors.append(f'{where} duplicate id "{prop_id}"')
+            ids.add(prop_id)
+        options = prop.get('options')
+        if not isinstance(options, list) or len(options) != 2:
+            errors.append(f'{where} needs exactly 2 "options"')
+            continue
+        for option in options:
+            if isinstance(option, dict):
+                if 'value' in option and not isinstance(option['value'], (int, float)):
+                    errors.append(f'{where} over/under "value" must be a number')
+                elif 'value' not in option and 'display' not in option:
+                    errors.append(f'{where} option objects need "display" or "side"/"value"')
+            elif not isinstance(option, (str, int, float)):
+                errors.append(f'{where} options must be strings or objects')
+    
+    fields = config.get('freeform_fields', [])
+    if not isinstance(fields, list) or not all(isinstance(field, dict) for field in fields):
+        errors.append('"freeform_fields" must be a list of objects')
+    return errors
+
+
+def import_config(config, source_hash=None):
+    """Bring prop_questions and freeform_fields in line with a parsed config.
+    
+    Props are matched on their config id, so reloading only writes what
+    changed: new props are inserted, changed ones updated in place and
+    props no longer in the file are deactivated rather than deleted, so
+    players' picks and any grading survive. Questions without an id (from
+    before ids were stored) are adopted by matching their text; any left
+    over, like questions added in the admin panel, are not touched.
+    Everything is applied in one transaction. Returns the counts
+    {'inserted', 'updated', 'deactivated', 'fields'}.
+    
+    With source_hash, the hash of the file's contents is recorded with the
+    import, and a config whose hash is already recorded is skipped
+    (returns None), so each version of the file is applied only once.
+    """
+    props = parse_props(config)
+    fields = [parse_freeform_field(field, i)
+              for i, field in enumerate(config.get('freeform_fields', []))]
+    
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if source_hash is not None:
+            cursor.execute("SELECT value FROM settings WHERE key = 'props_config_hash'")
+            row = cursor.fetchone()
+            if row is not None and row['value'] == source_hash:
+                return None
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES ('props_config_hash', ?, CURRENT_TIMESTAMP)
+            ''', (source_hash,))
+            CacheGenerations.bump(conn, 'settings')
+        
+        cursor.execute('SELECT * FROM prop_questions')
+        rows = cursor.fetchall()
+        by_key = {row['prop_key']: row for row in rows if row['prop_key'] is not None}
+        legacy = {}
+        for row in rows:
+            if row['prop_key'] is None:
+                legacy.setdefault(row['question'], []).append(row)
+        
+        inserts, updates = [], []
+        reactivated = False
+        seen = set()
+        for prop in props:
+            row = by_key.get(prop['prop_key'])
+            if row is None and legacy.get(prop['question']):
+                row = legacy[prop['question']].pop(0)
+            if row is None:
+                inserts.append(prop)
+                continue
+            seen.add(row['id'])
+            if (row['prop_key'] != prop['prop_key'] or not row['is_active']
+                    or any(row[column] != prop[column] for column in PROP_COLUMNS)):
+                updates.append(dict(prop, id=row['id']))
+                reactivated = reactivated or not row['is_active']
+        
+        retired = [(row['id'],) for row in rows
+                   if row['id'] not in seen and row['is_active'] and row['prop_key'] is not None]
+        
+        cursor.executemany('''
+            INSERT INTO prop_questions (prop_key, category, question, option_a, option_b,
+                                        display_order, is_active, line, stat_key)
+            VALUES (:prop_key, :category, :question, :option_a, :option_b,
+                    :display_order, 1, :line, :stat_key)
+        ''', inserts)
+        cursor.executemany('''
+            UPDATE prop_questions SET prop_key = :prop_key, category = :category,
+                                      question = :question, option_a = :option_a,
+                                      option_b = :option_b, display_order = :display_order,
+                                      is_active = 1, line = :line, stat_key = :stat_key
+            WHERE id = :id
+        ''', updates)
+        cursor.executemany('UPDATE prop_questions SET is_active = 0 WHERE id = ?', retired)
+        
+        # Tiebreakers keep their correct value and players' answers
+        before = conn.total_changes
+        cursor.executemany('''
+            INSERT INTO freeform_fields (field_id, label, field_type, placeholder, display_order)
+            VALUES (:field_id, :label, :field_type, :placeholder, :display_order)
+            ON CONFLICT (field_id) DO UPDATE SET
+                label = excluded.label, field_type = excluded.field_type,
+                placeholder = excluded.placeholder, display_order = excluded.display_order
+            WHERE label IS NOT excluded.label OR field_type IS NOT excluded.field_type
+               OR placeholder IS NOT excluded.placeholder
+               OR display_order IS NOT excluded.display_order
+        ''', fields)
+        fields_changed = conn.total_changes - before
+        
+        if inserts or updates or retired or fields_changed:
+            CacheGenerations.bump(conn, 'questions')
+        if inserts or retired or reactivated:
+            # The set of active questions changed
+            Score.rebuild(conn)
+    
+    return {
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'deactivated': len(retired),
+        'fields': fields_changed,
+    }
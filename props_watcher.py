@@ -0,0 +1,83 @@
+"""
+Hot reload of props_config.json
+Each worker's watcher thread stats the file; only when its mtime or size
+moves is it read and hashed, and only a new hash is validated and imported
+"""
+import hashlib
+import json
+import os
+import threading
+
+from background import ProcessThread
+from config import Config
+from migrations import database_lock
+from props_loader import PROPS_CONFIG_FILE, import_config, validate_config
+
+
+class PropsWatcher(ProcessThread):
+    """Per-process watcher that applies edits to props_config.json"""
+    
+    def __init__(self, path=None, interval=None):
+        super().__init__('props-watcher')
+        self.path = path or PROPS_CONFIG_FILE
+        self.interval = Config.PROPS_WATCH_INTERVAL if interval is None else interval
+        self._signature = None
+        self._digest = None
+        self._stop = threading.Event()
+    
+    def check(self):
+        """Apply the file if it changed; returns the import summary or None"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return None
+        
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if digest == self._digest:
+            self._signature = signature
+            return None  # Touched but not edited
+        
+        try:
+            config = json.loads(content)
+        except ValueError as e:
+            print(f"⚠ props_config.json is not valid JSON, not reloading: {e}")
+            self._signature, self._digest = signature, digest
+            return None
+        errors = validate_config(config)
+        if errors:
+            print(f"⚠ props_config.json has {len(errors)} problem(s), not reloading: {'; '.join(errors[:5])}")
+            self._signature, self._digest = signature, digest
+            return None
+        
+        # Every worker notices the edit; the lock plus the recorded hash make
+        # sure only the first one imports it, and the generation bumps in the
+        # import tell the others to drop their caches
+        with database_lock('props'):
+            summary = import_config(config, source_hash=digest)
+        # Only remembered once applied: if the import fails (e.g. the
+        # database stayed busy) the next check tries the same edit again
+        self._signature, self._digest = signature, digest
+        if summary is not None:
+            print(f"✓ Reloaded props_config.json: {summary['inserted']} added, "
+                  f"{summary['updated']} updated, {summary['deactivated']} deactivated")
+        return summary
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠ Props reload failed: {e}")
+    
+    def ensure_started(self):
+        """Start this process's watcher thread unless watching is switched off"""
+        if self.interval > 0:
+            super().ensure_started()
+
+
+props_watcher = PropsWatcher()
@@ -52,7 +52,7 @@ Type=simple
 User=$USER
 WorkingDirectory=$APP_DIR
 Environment="PATH=$APP_DIR/venv/bin"
-ExecStart=$APP_DIR/venv/bin/gunicorn --workers 3 --bind 127.0.0.1:5000 app:app
+ExecStart=$APP_DIR/venv/bin/gunicorn -c gunicorn.conf.py --workers 3 --bind 127.0.0.1:5000 app:app
 Restart=always
 RestartSec=10
 
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Live stat feed that auto-grades over/under props
+A feed adapter yields stat updates; each update grades only the line props
+whose stat crossed (or finished on one side of) its line
+
+Run alongside the web app:
+    python stat_feed.py --file stats.json          # watch a JSON file
+    python stat_feed.py --replay game.ndjson -s 60  # replay a recorded game
+"""
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+
+# Add the project directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import init_db, PropQuestion
+
+
+class StatFeed(ABC):
+    """Source of stat updates.
+    
+    updates() yields dicts of the form
+        {"stats": {"game_total": 31, ...}, "final": ["game_total"] | true}
+    where "final" marks stats that will not change again (true for all).
+    Adapters for a real data provider only need to implement updates().
+    """
+    
+    @abstractmethod
+    def updates(self):
+        """Yield stat updates until the game is over"""
+
+
+class FileFeed(StatFeed):
+    """Re-read a JSON stat file whenever it changes (hand-edited or written by a scraper)"""
+    
+    def __init__(self, path, poll_interval=1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+    
+    def updates(self):
+        last_mtime = None
+        while True:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            
+            if mtime is not None and mtime != last_mtime:
+                last_mtime = mtime
+                try:
+                    with open(self.path, 'r') as f:
+                        yield json.load(f)
+                except ValueError as e:
+                    # Probably caught mid-write; the next write changes mtime again
+                    print(f"⚠ Skipping unreadable stat file: {e}")
+            
+            time.sleep(self.poll_interval)
+
+
+class ReplayFeed(StatFeed):
+    """Replay a recorded game: one JSON update per line, with "t" in seconds from kickoff"""
+    
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+    
+    def updates(self):
+        started = time.monotonic()
+        with open(self.path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                update = json.loads(line)
+                if self.speed > 0:
+                    delay = update.get('t', 0) / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                yield update
+
+
+def resolve(question, value, final):
+    """Get the answer a stat value settles an over/under prop on, or None if still open.
+    
+    Counting stats only go up, so over is settled as soon as the line is
+    crossed; under is only settled once the stat is final.
+    """
+    if value > question.line:
+        return 'A'
+    if final and value < question.line:
+        return 'B'
+    return None
+
+
+def apply_update(update):
+    """Grade the line props settled by one stat update; returns the number changed"""
+    stats = {}
+    for stat_key, value in (update.get('stats') or {}).items():
+        try:
+            stats[stat_key] = float(value)
+        except (ValueError, TypeError):
+            print(f"⚠ Ignoring non-numeric stat {stat_key}={value!r}")
+    final = update.get('final') or ()
+    
+    answers = {}
+    for question in PropQuestion.get_lines(stats):
+        is_final = final is True or question.stat_key in final
+        answer = resolve(question, stats[question.stat_key], is_final)
+        if answer and answer != question.correct_answer:
+            answers[question.id] = answer
+    
+    if not answers:
+        return 0
+    
+    # Only the settled props are graded, each rescoring just its pickers
+    changed, version = PropQuestion.grade(answers)
+    print(f"✓ Auto-graded {changed} prop(s) (leaderboard version {version})")
+    return changed
+
+
+def run(feed):
+    """Apply every update from a feed as it arrives"""
+    for update in feed.updates():
+        try:
+            apply_update(update)
+        except Exception as e:
+            print(f"⚠ Failed to apply stat update: {e}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Auto-grade over/under props from a stat feed')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--file', help='JSON stat file to watch')
+    source.add_argument('--replay', help='Recorded game (one JSON update per line) to replay')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between checks of --file (default: 1)')
+    parser.add_argument('-s', '--speed', type=float, default=1.0,
+                        help='Replay speed multiplier, 0 for no delay (default: 1)')
+    args = parser.parse_args()
+    
+    init_db()
+    feed = FileFeed(args.file, args.interval) if args.file else ReplayFeed(args.replay, args.speed)
+    try:
+        run(feed)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# Add the project directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A freshly migrated database of its own for each test"""
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setattr(Config, 'PROPS_WATCH_INTERVAL', 0)
+    from database import CacheGenerations, get_pool, init_db
+    
+    init_db()
+    # Caches filled against an earlier test's database are stale here
+    for callbacks in list(CacheGenerations._subscribers.values()):
+        for callback in callbacks:
+            callback()
+    CacheGenerations._seen = {}
+    yield Config.DATABASE_PATH
+    get_pool().close_all()
+
+
+@pytest.fixture
+def admin_client(database, monkeypatch):
+    """A test client logged in as the commissioner of a bootstrapped game"""
+    monkeypatch.setenv('MASTER_KEY', 'test-password')
+    import app as app_module
+    
+    app_module.bootstrap()
+    flask_app = app_module.create_app()
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    client = flask_app.test_client()
+    response = client.post('/admin/login', data={'password': 'test-password'})
+    assert response.status_code == 302
+    return client
@@ -0,0 +1,58 @@
+"""
+Per-process background threads start once per process, and again in a
+forked child (where the parent's thread does not exist)
+"""
+import multiprocessing
+import threading
+
+import pytest
+
+from background import ProcessThread
+
+fork = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                          reason='needs fork()')
+
+
+class Sleeper(ProcessThread):
+    def __init__(self):
+        super().__init__('test-sleeper')
+        self.starts = 0
+        self._stop = threading.Event()
+    
+    def _on_start(self):
+        self.starts += 1
+    
+    def _run(self):
+        self._stop.wait()
+
+
+def _thread_names():
+    return [thread.name for thread in threading.enumerate()]
+
+
+def test_starts_once_per_process():
+    sleeper = Sleeper()
+    for _ in range(3):
+        sleeper.ensure_started()
+    assert sleeper.starts == 1
+    assert _thread_names().count('test-sleeper') == 1
+    sleeper._stop.set()
+
+
+@fork
+def test_restarts_after_fork():
+    sleeper = Sleeper()
+    sleeper.ensure_started()
+    
+    def child():
+        # The parent's thread was not copied; the first call starts our own
+        assert 'test-sleeper' not in _thread_names()
+        sleeper.ensure_started()
+        assert sleeper.starts == 2
+        assert 'test-sleeper' in _thread_names()
+    
+    process = multiprocessing.get_context('fork').Process(target=child)
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    sleeper._stop.set()
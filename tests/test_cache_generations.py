@@ -0,0 +1,83 @@
+"""
+Cross-process cache coherence: a write committed by another (forked)
+process must invalidate this process's generation caches
+"""
+import multiprocessing
+
+import pytest
+
+from database import CacheGenerations, GenerationCache, PropQuestion, Settings, db_connection
+
+fork = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                          reason='needs fork()')
+
+
+def _in_child(target):
+    """Run target() in a forked process, like another gunicorn worker"""
+    process = multiprocessing.get_context('fork').Process(target=target)
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+
+
+def _set_title():
+    Settings.set('game_title', 'Forked Bowl')
+
+
+def _add_question():
+    PropQuestion(category='Props', question='Forked?', option_a='Yes', option_b='No').save()
+
+
+def _bump_teams():
+    with db_connection() as conn:
+        CacheGenerations.bump(conn, 'teams')
+
+
+def _count_loads(loads):
+    def loader(conn):
+        loads.append(1)
+        title = conn.execute("SELECT value FROM settings WHERE key = 'game_title'").fetchone()
+        count = conn.execute('SELECT COUNT(*) FROM prop_questions').fetchone()[0]
+        return (title['value'] if title else None, count)
+    return loader
+
+
+@fork
+def test_child_settings_write_reloads_parent_cache(database):
+    loads = []
+    cache = GenerationCache(('settings', 'questions'), _count_loads(loads))
+    title, count = cache.get()
+    assert cache.get() == (title, count)
+    assert len(loads) == 1
+    
+    Settings.get('game_title')  # fill the settings cache before the child writes
+    _in_child(_set_title)
+    
+    assert cache.get() == ('Forked Bowl', count)
+    assert len(loads) == 2
+    assert Settings.get('game_title') == 'Forked Bowl'
+
+
+@fork
+def test_child_question_write_reloads_parent_cache(database):
+    loads = []
+    cache = GenerationCache(('settings', 'questions'), _count_loads(loads))
+    _, count = cache.get()
+    
+    _in_child(_add_question)
+    
+    assert cache.get()[1] == count + 1
+    assert len(loads) == 2
+    assert [question.question for question in PropQuestion.get_all()][-1] == 'Forked?'
+
+
+@fork
+def test_unrelated_generation_keeps_parent_cache(database):
+    loads = []
+    cache = GenerationCache(('settings', 'questions'), _count_loads(loads))
+    cache.get()
+    
+    _in_child(_bump_teams)
+    
+    cache.get()
+    assert len(loads) == 1
@@ -0,0 +1,29 @@
+"""
+Dashboard picks tabs: one page of players at a time, with pick counts
+for the whole pool
+"""
+from datetime import datetime
+
+from config import Config
+from database import PropQuestion, User, UserAnswer
+
+
+def test_picks_are_paged_and_counted_across_pages(admin_client, monkeypatch):
+    monkeypatch.setattr(Config, 'DASHBOARD_PICKS_PAGE_SIZE', 2)
+    User.create_many(['Ann', 'Bea', 'Cal'])
+    question = PropQuestion.get_active()[0]
+    now = datetime.utcnow().isoformat()
+    UserAnswer.save_many([(user.id, question.id, 'A', now) for user in User.get_participants()])
+    
+    first = admin_client.get('/dashboard').get_data(as_text=True)
+    assert 'Players 1–2 of 3' in first
+    assert 'Ann: ' in first and 'Cal: ' not in first
+    assert '3 picks' in first
+    
+    last = admin_client.get('/dashboard?page=2').get_data(as_text=True)
+    assert 'Players 3–3 of 3' in last
+    assert 'Cal: ' in last and 'Ann: ' not in last
+    assert '3 picks' in last
+    
+    # Past the end: the last page
+    assert 'Players 3–3 of 3' in admin_client.get('/dashboard?page=9').get_data(as_text=True)
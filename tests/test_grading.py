@@ -0,0 +1,35 @@
+"""
+Grading through /api/admin/grade: only 'A', 'B', '' and null are answers
+"""
+import pytest
+
+from database import PropQuestion
+
+
+@pytest.fixture
+def graded_question(admin_client):
+    question = PropQuestion.get_active()[0]
+    response = admin_client.post('/api/admin/grade', json={'answers': {str(question.id): 'A'}})
+    assert response.status_code == 200
+    return question.id
+
+
+@pytest.mark.parametrize('value', [0, [], False, {}, 'C'])
+def test_rejects_values_that_are_not_answers(admin_client, graded_question, value):
+    response = admin_client.post('/api/admin/grade', json={'answers': {str(graded_question): value}})
+    assert response.status_code == 400
+    assert PropQuestion.get_by_id(graded_question).correct_answer == 'A'
+
+
+@pytest.mark.parametrize('value', ['', None])
+def test_empty_answer_clears_the_grade(admin_client, graded_question, value):
+    response = admin_client.post('/api/admin/grade', json={'answers': {str(graded_question): value}})
+    assert response.status_code == 200
+    assert response.get_json()['changed'] == 1
+    assert PropQuestion.get_by_id(graded_question).correct_answer is None
+
+
+@pytest.mark.parametrize('value', [[], True])
+def test_rejects_tiebreaker_values_that_are_not_scalars(admin_client, value):
+    response = admin_client.post('/api/admin/grade', json={'answers': {}, 'freeform': {'total_points': value}})
+    assert response.status_code == 400
@@ -0,0 +1,60 @@
+"""
+Live update streams: lock-only clients never see scores, and a client
+that can't keep up is dropped and its stream ends, so the browser reconnects
+"""
+import pytest
+
+from config import Config
+from live import LiveHub
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_CLIENT_BUFFER', 2)
+    hub = LiveHub()
+    # No hub thread: the tests publish by hand
+    monkeypatch.setattr(hub, 'ensure_started', lambda: None)
+    return hub
+
+
+HELLO = {'is_locked': False, 'lock_time': None, 'version': None}
+
+
+def test_stream_delivers_published_events(hub):
+    client = hub.subscribe()
+    stream = hub.stream(client, HELLO)
+    assert next(stream).startswith('retry:')
+    assert next(stream).startswith('event: hello\n')
+    
+    hub.publish('lock', {'is_locked': True})
+    assert next(stream) == 'event: lock\ndata: {"is_locked":true}\n\n'
+    
+    stream.close()
+    assert hub.client_count == 0
+
+
+def test_lock_only_client_skips_score_events(hub):
+    client = hub.subscribe(scores=False)
+    stream = hub.stream(client, HELLO)
+    next(stream), next(stream)
+    
+    hub.publish('leaderboard', {'version': 1}, scores=True)
+    hub.publish('lock', {'is_locked': True})
+    assert next(stream).startswith('event: lock\n')
+    assert client.queue.empty()
+    stream.close()
+
+
+def test_client_that_falls_behind_ends_its_stream(hub):
+    client = hub.subscribe()
+    stream = hub.stream(client, HELLO)
+    next(stream), next(stream)
+    
+    for n in range(3):
+        hub.publish('leaderboard', {'version': n}, scores=True)
+    assert client.closed
+    # Still holding a thread, so still counted against LIVE_MAX_STREAMS
+    assert hub.client_count == 1
+    
+    assert list(stream) == []
+    assert hub.client_count == 0
@@ -0,0 +1,145 @@
+"""
+Query plans: every SQL statement in the app modules is run through
+EXPLAIN QUERY PLAN, and a full scan or temporary sort of a table that grows
+with the player pool fails the test unless it is listed in ALLOWED below.
+"""
+import ast
+import os
+import re
+
+import pytest
+
+from database import get_db_connection
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['app.py', 'database.py', 'props_loader.py', 'win_probability.py']
+EXECUTORS = {'execute', 'executemany', 'stream_query'}
+
+# Tables with a row (or many) per player
+LARGE_TABLES = {'users', 'user_answers', 'user_freeform_answers', 'scores', 'pick_vectors'}
+
+# Statements that read a whole large table on purpose, keyed by
+# (module, function) with the reason
+ALLOWED = {
+    ('app.py', '_export_players'): 'the export walks every player in rowid order',
+    ('database.py', 'User.get_all'): 'every user, walked in idx_users_admin_name order',
+    ('database.py', '_load_pick_counts'): 'pick counts per question for the dashboard, cached per answers generation',
+    ('database.py', 'UserFreeformAnswer.get_all_answers'): 'every tiebreaker guess, listed beside the dashboard leaderboard',
+    ('database.py', 'PickVectors.load'): 'the win-probability model takes every vector',
+    ('database.py', 'Score._tiebreaker_diffs'): 'each player\'s last graded tiebreaker is a windowed sort',
+    ('database.py', 'Score.rescore_tiebreakers'): 'a tiebreaker regrade clears every player\'s distance',
+    ('database.py', '_load_leaderboard'): 'the cached leaderboard ranks every player',
+}
+
+SQL_START = re.compile(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\b', re.IGNORECASE)
+TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+SCAN = re.compile(r'^SCAN (\w+)')
+
+
+def _text(node):
+    """The SQL in a string literal, with f-string fields turned into parameters"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return ''.join(part.value if isinstance(part, ast.Constant) else '?'
+                       for part in node.values)
+    return None
+
+
+def _assigned(scope, name):
+    """Join every string assigned (or +=) to name in scope, in source order"""
+    parts = []
+    for node in ast.walk(scope):
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == name for target in node.targets):
+            parts.append((node.lineno, _text(node.value)))
+        elif (isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name)
+              and node.target.id == name):
+            parts.append((node.lineno, _text(node.value)))
+    texts = [text for _, text in sorted(parts)]
+    if texts and None not in texts:
+        return ''.join(texts)
+    return None
+
+
+def _statements(module):
+    """Yield (function, lineno, sql) for each statement the module executes"""
+    with open(os.path.join(ROOT, module)) as f:
+        tree = ast.parse(f.read())
+    
+    def visit(node, scopes):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.ClassDef)):
+                yield from visit(child, scopes + [child])
+                continue
+            if isinstance(child, ast.Call) and child.args:
+                func = child.func
+                name = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', None)
+                if name in EXECUTORS:
+                    sql = _text(child.args[0])
+                    if sql is None and isinstance(child.args[0], ast.Name):
+                        for scope in reversed([tree] + scopes):
+                            sql = _assigned(scope, child.args[0].id)
+                            if sql is not None:
+                                break
+                    if sql is not None and SQL_START.match(sql):
+                        qualname = '.'.join(scope.name for scope in scopes)
+                        yield qualname, child.lineno, sql
+            yield from visit(child, scopes)
+    
+    yield from visit(tree, [])
+
+
+STATEMENTS = [(module, *statement) for module in MODULES for statement in _statements(module)]
+
+
+def _plan(conn, sql):
+    names = re.findall(r'(?<!:):(\w+)', sql)
+    params = dict.fromkeys(names) if names else [None] * sql.count('?')
+    return [row['detail'] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def _problems(sql, plan):
+    tables = {}
+    for table, alias in TABLE_REF.findall(sql):
+        tables[table.lower()] = table.lower()
+        if alias and alias.upper() not in {'ON', 'WHERE', 'SET', 'VALUES', 'USING', 'ORDER',
+                                           'GROUP', 'LEFT', 'JOIN', 'INNER', 'LIMIT'}:
+            tables[alias.lower()] = table.lower()
+    problems = []
+    for detail in plan:
+        match = SCAN.match(detail)
+        if match and tables.get(match.group(1).lower()) in LARGE_TABLES:
+            problems.append(detail)
+        if 'TEMP B-TREE' in detail and LARGE_TABLES & set(tables.values()):
+            problems.append(detail)
+    return problems
+
+
+def test_statements_found():
+    """The extractor still sees the queries (a refactor must not blind it)"""
+    assert len(STATEMENTS) > 50
+    assert {module for module, *_ in STATEMENTS} == set(MODULES)
+
+
+@pytest.mark.parametrize('module,function,lineno,sql', STATEMENTS,
+                         ids=[f'{module}:{lineno}' for module, _, lineno, _ in STATEMENTS])
+def test_no_unplanned_scans(database, module, function, lineno, sql):
+    conn = get_db_connection()
+    try:
+        problems = _problems(sql, _plan(conn, sql))
+    finally:
+        conn.close()
+    if (module, function) not in ALLOWED:
+        assert not problems, f'{module}:{lineno} in {function or "<module>"}: {problems}'
+
+
+def test_allowed_entries_still_scan(database):
+    """Every ALLOWED entry still matches a statement that scans"""
+    conn = get_db_connection()
+    try:
+        scanning = {(module, function) for module, function, _, sql in STATEMENTS
+                    if _problems(sql, _plan(conn, sql))}
+    finally:
+        conn.close()
+    assert set(ALLOWED) <= scanning, sorted(set(ALLOWED) - scanning)
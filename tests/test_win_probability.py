@@ -0,0 +1,32 @@
+"""
+Win odds break ties on points the same way the leaderboard does
+"""
+from datetime import datetime
+
+from database import FreeformField, PropQuestion, Score, User, UserAnswer, UserFreeformAnswer
+from props_loader import import_config, load_config
+from win_probability import win_probabilities
+
+
+def test_ties_follow_the_last_graded_tiebreaker(database):
+    import_config(load_config())
+    FreeformField(field_id='halftime', label='Halftime points', display_order=-1).save()
+    User.create_many(['Near', 'Far'])
+    near, far = sorted(User.get_participants(), key=lambda user: user.display_name != 'Near')
+    
+    # Identical picks, so every outcome leaves the two level on points
+    now = datetime.utcnow().isoformat()
+    UserAnswer.save_many([(user.id, question.id, 'A', now)
+                          for user in (near, far) for question in PropQuestion.get_active()])
+    UserFreeformAnswer.save_answer(near.id, 'halftime', '20')
+    UserFreeformAnswer.save_answer(far.id, 'halftime', '30')
+    # On the still-open last tiebreaker Far looks closer to the pool
+    UserFreeformAnswer.save_answer(near.id, 'total_score', '90')
+    UserFreeformAnswer.save_answer(far.id, 'total_score', '47')
+    PropQuestion.grade({}, {'halftime': '21'})
+    
+    ranks = {user.id: score['rank'] for user, score in Score.get_leaderboard()}
+    assert ranks[near.id] < ranks[far.id]
+    chances = win_probabilities()
+    assert chances[near.id] == 1.0
+    assert chances[far.id] == 0.0
@@ -0,0 +1,284 @@
+"""
+Win probabilities while the game is live
+Answers "what are my chances?" for every player from the graded key, the
+props still open and a prior for each of them
+"""
+import multiprocessing
+import os
+import random
+import statistics
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from config import Config
+from database import GenerationCache, PickVectors, Score
+
+
+# ----------------------------------------------------------------------
+# Simulation core
+#
+# Players are bit positions. Each open prop is a pair of player sets (who
+# picked A, who picked B), and running scores live in a bit-sliced counter:
+# planes[k] holds bit k of every player's score. Adding a point to a set of
+# players is a ripple-carry over a handful of big-int operations, and the
+# leaders fall out of a scan from the top plane down, so one simulated game
+# costs O(props * log(score)) integer operations whatever the pool size.
+# ----------------------------------------------------------------------
+
+def _add(planes, players):
+    """Add one point to every player in the set"""
+    carry = players
+    for k, plane in enumerate(planes):
+        if not carry:
+            return
+        planes[k], carry = plane ^ carry, plane & carry
+    if carry:
+        planes.append(carry)
+
+
+def _leaders(planes, everyone):
+    """Get the set of players with the highest score"""
+    leaders = everyone
+    for plane in reversed(planes):
+        top = leaders & plane
+        if top:
+            leaders = top
+    return leaders
+
+
+def _members(players):
+    members = []
+    while players:
+        lowest = players & -players
+        members.append(lowest.bit_length() - 1)
+        players ^= lowest
+    return members
+
+
+def _closest_shares(players, guesses, mu, sigma):
+    """Split a win by how likely each guess is to end up closest to the result"""
+    by_guess = {}
+    for player in players:
+        by_guess.setdefault(guesses[player], []).append(player)
+    values = sorted(by_guess)
+    outcome = NormalDist(mu, sigma)
+    
+    shares = []
+    lower = 0.0
+    for j, value in enumerate(values):
+        upper = outcome.cdf((value + values[j + 1]) / 2) if j + 1 < len(values) else 1.0
+        for player in by_guess[value]:
+            shares.append((player, (upper - lower) / len(by_guess[value])))
+        lower = upper
+    return shares
+
+
+def _split_first(leaders, tiebreak):
+    """Get [(player, share)] of first place among players level on points"""
+    players = _members(leaders)
+    if len(players) > 1 and tiebreak is not None:
+        mode, values = tiebreak[0], tiebreak[1]
+        known = [player for player in players if values[player] is not None]
+        if known and mode == 'graded':
+            best = min(values[player] for player in known)
+            players = [player for player in known if values[player] == best]
+        elif known:
+            return _closest_shares(known, values, *tiebreak[2:])
+    share = 1 / len(players)
+    return [(player, share) for player in players]
+
+
+def _play(game, outcome, planes, shares_by_leaders, wins, weight):
+    for j, (picked_a, picked_b, _) in enumerate(game['props']):
+        _add(planes, picked_b if outcome[j] else picked_a)
+    leaders = _leaders(planes, game['everyone'])
+    shares = shares_by_leaders.get(leaders)
+    if shares is None:
+        shares = shares_by_leaders[leaders] = _split_first(leaders, game['tiebreak'])
+    for player, share in shares:
+        wins[player] = wins.get(player, 0.0) + share * weight
+
+
+def _enumerate(game):
+    """Weigh every possible outcome of the open props"""
+    props = game['props']
+    wins = {}
+    shares_by_leaders = {}
+    for bits in range(1 << len(props)):
+        outcome = [bits >> j & 1 for j in range(len(props))]
+        probability = 1.0
+        for taken, (_, _, p_b) in zip(outcome, props):
+            probability *= p_b if taken else 1 - p_b
+        if probability:
+            _play(game, outcome, list(game['planes']), shares_by_leaders, wins, probability)
+    return wins
+
+
+def _simulate(game, samples, seed):
+    """Play `samples` random games; returns summed wins per player"""
+    rng = random.Random(seed)
+    wins = {}
+    shares_by_leaders = {}
+    for _ in range(samples):
+        outcome = [rng.random() < p_b for _, _, p_b in game['props']]
+        _play(game, outcome, list(game['planes']), shares_by_leaders, wins, 1.0)
+    return wins
+
+
+# ----------------------------------------------------------------------
+# Process pool
+# ----------------------------------------------------------------------
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Get this process's worker pool, or None to simulate in-process"""
+    global _executor, _executor_pid
+    if Config.WIN_PROB_WORKERS < 2:
+        return None
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # spawn rather than fork: the web workers run threads
+            _executor = ProcessPoolExecutor(max_workers=Config.WIN_PROB_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _monte_carlo(game, seed):
+    samples = Config.WIN_PROB_SAMPLES
+    executor = _get_executor()
+    if executor is not None:
+        workers = Config.WIN_PROB_WORKERS
+        chunks = [samples // workers + (1 if n < samples % workers else 0) for n in range(workers)]
+        try:
+            futures = [executor.submit(_simulate, game, chunk, f'{seed}:{n}')
+                       for n, chunk in enumerate(chunks) if chunk]
+            wins = {}
+            for future in futures:
+                for player, won in future.result().items():
+                    wins[player] = wins.get(player, 0.0) + won
+            return wins, samples
+        except Exception as e:
+            print(f"⚠ Win probability workers failed, simulating in-process: {e}")
+    return _simulate(game, samples, f'{seed}:0'), samples
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def _load_tiebreak(conn, players, scores):
+    """Describe how ties on points are broken.
+    
+    ('graded', distances) once any tiebreaker has a correct value: the
+    distances are the scores table's, from each player's last graded
+    tiebreaker, exactly as the leaderboard ranks them. Until then,
+    ('open', guesses, mu, sigma) on the last tiebreaker, with the result
+    modelled as normal around the pool's median guess.
+    """
+    if Score.tiebreaker_graded(conn):
+        return ('graded', [scores[user_id]['tiebreaker_diff'] for user_id in players])
+    field = conn.execute('''
+        SELECT field_id FROM freeform_fields
+        ORDER BY display_order DESC, id DESC LIMIT 1
+    ''').fetchone()
+    if field is None:
+        return None
+    
+    guesses = {}
+    for row in conn.execute('SELECT user_id, value FROM user_freeform_answers WHERE field_id = ?',
+                            (field['field_id'],)):
+        try:
+            guesses[row['user_id']] = float(row['value'])
+        except (ValueError, TypeError):
+            pass
+    if not guesses:
+        return None
+    values = list(guesses.values())
+    sigma = max(statistics.pstdev(values), 1.0) if len(values) > 1 else 1.0
+    return ('open', [guesses.get(user_id) for user_id in players],
+            statistics.median(values), sigma)
+
+
+def _load_game(conn):
+    """Pack the current state of the game for simulation; None once nothing is open"""
+    key, graded, active = PickVectors.load_key(conn)
+    open_props = active & ~graded
+    open_ids = _members(open_props)
+    scores = {row['id']: row for row in conn.execute('''
+        SELECT u.id, COALESCE(s.correct, 0) AS correct, s.tiebreaker_diff
+        FROM users u
+        LEFT JOIN scores s ON s.user_id = u.id
+        WHERE u.is_admin = 0
+    ''')}
+    if not open_ids or not scores:
+        return None
+    
+    players = sorted(scores)
+    vectors = PickVectors.load(conn)
+    picked_a = dict.fromkeys(open_ids, 0)
+    picked_b = dict.fromkeys(open_ids, 0)
+    planes = []
+    for index, user_id in enumerate(players):
+        bit = 1 << index
+        picks, answered = vectors.get(user_id, (0, 0))
+        for question_id in _members(answered & open_props):
+            if picks >> question_id & 1:
+                picked_b[question_id] |= bit
+            else:
+                picked_a[question_id] |= bit
+        correct = scores[user_id]['correct']
+        for k in range(correct.bit_length()):
+            if correct >> k & 1:
+                planes.extend([0] * (k + 1 - len(planes)))
+                planes[k] |= bit
+    
+    props = []
+    for question_id in open_ids:
+        if Config.WIN_PROB_PRIORS == 'picks':
+            count_a = picked_a[question_id].bit_count()
+            count_b = picked_b[question_id].bit_count()
+            p_b = (count_b + 1) / (count_a + count_b + 2)
+        else:
+            p_b = 0.5
+        props.append((picked_a[question_id], picked_b[question_id], p_b))
+    
+    return {
+        'players': players,
+        'everyone': (1 << len(players)) - 1,
+        'planes': planes,
+        'props': props,
+        'tiebreak': _load_tiebreak(conn, players, scores),
+    }
+
+
+def _load_win_probabilities(conn):
+    game = _load_game(conn)
+    if game is None:
+        return {}
+    
+    if len(game['props']) <= Config.WIN_PROB_EXACT_MAX_PROPS:
+        wins, total = _enumerate(game), 1.0
+    else:
+        # Seed from the grading version so every worker shows the same numbers
+        row = conn.execute("SELECT generation FROM cache_generations WHERE name = 'scores'").fetchone()
+        wins, total = _monte_carlo(game, row['generation'] if row else 0)
+    
+    return {user_id: wins.get(index, 0.0) / total
+            for index, user_id in enumerate(game['players'])}
+
+
+_win_cache = GenerationCache(('scores', 'questions', 'answers', 'users'), _load_win_probabilities)
+_compute_lock = threading.Lock()
+
+
+def win_probabilities():
+    """Get {user_id: chance of finishing first}; empty once every prop is graded"""
+    # One thread computes a new version while the others wait for it
+    with _compute_lock:
+        return _win_cache.get()